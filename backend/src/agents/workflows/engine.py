@@ -9,6 +9,7 @@ for workflow creation.
 from typing import Dict, List, Optional, Any, Callable, Set, Union, Tuple
 import asyncio
 import logging
+import re
 from uuid import UUID, uuid4
 
 from ..core.agent_types import Task, AgentResult, AgentType
@@ -40,6 +41,9 @@ class GraphWorkflowEngine:
         if errors:
             raise ValueError(f"Invalid workflow: {', '.join(errors)}")
         
+        # Mappings are compiled once per graph and reused across executions
+        plan = get_execution_plan(workflow)
+        
         # Initialize workflow state
         workflow_id = uuid4()
         state = WorkflowState(
@@ -67,7 +71,7 @@ class GraphWorkflowEngine:
                     
                     # Process the node
                     try:
-                        result = await self._process_node(node, state)
+                        result = await self._process_node(node, state, plan.get(node_id))
                         state.results[node_id] = result
                         state.completed_nodes.add(node_id)
                         
@@ -80,8 +84,8 @@ class GraphWorkflowEngine:
                         # On error, try to find error edges
                         error_next_nodes = [
                             edge.target_node 
-                            for edge in workflow.edges 
-                            if edge.source_node == node_id and edge.condition == EdgeCondition.FAILURE
+                            for edge in workflow.get_outgoing_edges(node_id) 
+                            if edge.condition == EdgeCondition.FAILURE
                         ]
                         
                         if error_next_nodes:
@@ -109,8 +113,12 @@ class GraphWorkflowEngine:
             if workflow_id in self.active_workflows:
                 del self.active_workflows[workflow_id]
     
-    async def _process_node(self, node: WorkflowNode, state: WorkflowState) -> Any:
+    async def _process_node(self, node: WorkflowNode, state: WorkflowState,
+                            node_plan: Optional[Dict[str, Any]] = None) -> Any:
         """Process a single workflow node"""
+        if node_plan is None:
+            node_plan = compile_node_plan(node)
+        
         if node.type == NodeType.START:
             # Start nodes don't do anything
             return {"status": "started"}
@@ -127,59 +135,33 @@ class GraphWorkflowEngine:
             
             agent = self.agent_registry[agent_name]
             
-            # Create task from node config
-            task = Task(
-                query=node.config.get("query", ""),
-                agent_type=node.config.get("agent_type", "react"),
-                max_steps=node.config.get("max_steps", 10),
-                tools_allowed=node.config.get("tools_allowed", []),
-                parameters=node.config.get("parameters", {})
-            )
-            
             # Add context from workflow state
             task_context = state.context.copy()
-            for input_mapping in node.config.get("input_mappings", []):
-                source_node = input_mapping.get("source_node")
-                source_key = input_mapping.get("source_key", "output")
-                target_key = input_mapping.get("target_key")
-                
+            for source_node, key_path, target_key in node_plan["inputs"]:
                 if source_node and source_node in state.results and target_key:
-                    source_value = state.results[source_node]
-                    
-                    # Extract nested value if needed
-                    if source_key != "output":
-                        source_keys = source_key.split(".")
-                        for key in source_keys:
-                            if isinstance(source_value, dict) and key in source_value:
-                                source_value = source_value[key]
-                            else:
-                                source_value = None
-                                break
+                    source_value = extract_value(state.results[source_node], key_path)
                     
                     if source_value is not None:
                         task_context[target_key] = source_value
             
+            # Create task from node config, rendering the query from the
+            # template parts parsed when the execution plan was compiled
+            task = Task(
+                query=render_query_template(node_plan["query_parts"], task_context),
+                agent_type=node.config.get("agent_type", "react"),
+                max_steps=node.config.get("max_steps", 10),
+                tools_allowed=node.config.get("tools_allowed", []),
+                parameters=node.config.get("parameters", {})
+            )
+            
             # Execute agent task
             result = await agent.execute(task)
             
             # Process output mappings
             output = {"output": result}
-            for output_mapping in node.config.get("output_mappings", []):
-                source_key = output_mapping.get("source_key", "output")
-                target_key = output_mapping.get("target_key")
-                
+            for key_path, target_key in node_plan["outputs"]:
                 if target_key:
-                    source_value = result
-                    
-                    # Extract nested value if needed
-                    if source_key != "output":
-                        source_keys = source_key.split(".")
-                        for key in source_keys:
-                            if isinstance(source_value, dict) and key in source_value:
-                                source_value = source_value[key]
-                            else:
-                                source_value = None
-                                break
+                    source_value = extract_value(result, key_path)
                     
                     if source_value is not None:
                         output[target_key] = source_value
@@ -198,23 +180,9 @@ class GraphWorkflowEngine:
             tool_args = node.config.get("arguments", {}).copy()
             
             # Add context from workflow state
-            for input_mapping in node.config.get("input_mappings", []):
-                source_node = input_mapping.get("source_node")
-                source_key = input_mapping.get("source_key", "output")
-                target_key = input_mapping.get("target_key")
-                
+            for source_node, key_path, target_key in node_plan["inputs"]:
                 if source_node and source_node in state.results and target_key:
-                    source_value = state.results[source_node]
-                    
-                    # Extract nested value if needed
-                    if source_key != "output":
-                        source_keys = source_key.split(".")
-                        for key in source_keys:
-                            if isinstance(source_value, dict) and key in source_value:
-                                source_value = source_value[key]
-                            else:
-                                source_value = None
-                                break
+                    source_value = extract_value(state.results[source_node], key_path)
                     
                     if source_value is not None:
                         tool_args[target_key] = source_value
@@ -243,25 +211,9 @@ class GraphWorkflowEngine:
             
             # Get input array
             input_array = None
-            for input_mapping in node.config.get("input_mappings", []):
-                source_node = input_mapping.get("source_node")
-                source_key = input_mapping.get("source_key", "output")
-                target_key = input_mapping.get("target_key")
-                
+            for source_node, key_path, target_key in node_plan["inputs"]:
                 if target_key == input_key and source_node in state.results:
-                    source_value = state.results[source_node]
-                    
-                    # Extract nested value if needed
-                    if source_key != "output":
-                        source_keys = source_key.split(".")
-                        for key in source_keys:
-                            if isinstance(source_value, dict) and key in source_value:
-                                source_value = source_value[key]
-                            else:
-                                source_value = None
-                                break
-                    
-                    input_array = source_value
+                    input_array = extract_value(state.results[source_node], key_path)
                     break
             
             if not input_array or not isinstance(input_array, list):
@@ -287,25 +239,9 @@ class GraphWorkflowEngine:
             
             # Get input array
             input_array = None
-            for input_mapping in node.config.get("input_mappings", []):
-                source_node = input_mapping.get("source_node")
-                source_key = input_mapping.get("source_key", "output")
-                target_key = input_mapping.get("target_key")
-                
+            for source_node, key_path, target_key in node_plan["inputs"]:
                 if target_key == input_key and source_node in state.results:
-                    source_value = state.results[source_node]
-                    
-                    # Extract nested value if needed
-                    if source_key != "output":
-                        source_keys = source_key.split(".")
-                        for key in source_keys:
-                            if isinstance(source_value, dict) and key in source_value:
-                                source_value = source_value[key]
-                            else:
-                                source_value = None
-                                break
-                    
-                    input_array = source_value
+                    input_array = extract_value(state.results[source_node], key_path)
                     break
             
             if not input_array or not isinstance(input_array, list):
@@ -325,23 +261,9 @@ class GraphWorkflowEngine:
             # Merge results from multiple upstream nodes
             results = {}
             
-            for input_mapping in node.config.get("input_mappings", []):
-                source_node = input_mapping.get("source_node")
-                source_key = input_mapping.get("source_key", "output")
-                target_key = input_mapping.get("target_key")
-                
+            for source_node, key_path, target_key in node_plan["inputs"]:
                 if source_node and source_node in state.results and target_key:
-                    source_value = state.results[source_node]
-                    
-                    # Extract nested value if needed
-                    if source_key != "output":
-                        source_keys = source_key.split(".")
-                        for key in source_keys:
-                            if isinstance(source_value, dict) and key in source_value:
-                                source_value = source_value[key]
-                            else:
-                                source_value = None
-                                break
+                    source_value = extract_value(state.results[source_node], key_path)
                     
                     if source_value is not None:
                         results[target_key] = source_value
@@ -352,8 +274,107 @@ class GraphWorkflowEngine:
             raise ValueError(f"Unsupported node type: {node.type}")
 
 
+# Helpers for compiling workflow graphs ahead of execution
+
+def compile_mapping_key(source_key: str) -> Tuple[str, ...]:
+    """Split a dotted source key into the path walked at execution time"""
+    if source_key == "output":
+        return ()
+    
+    return tuple(source_key.split("."))
+
+
+def extract_value(value: Any, key_path: Tuple[str, ...]) -> Any:
+    """Extract a nested value along a compiled key path"""
+    for key in key_path:
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return None
+    
+    return value
+
+
+def compile_node_plan(node: WorkflowNode) -> Dict[str, Any]:
+    """Compile a node's query template and mappings into execution-ready tuples"""
+    return {
+        # Derived from the stored query, never persisted; the compiled plan is cached on the
+        # graph, so node edits must go through WorkflowGraph.update_node to take effect
+        "query_parts": (
+            parse_query_template(node.config.get("query", ""))
+            if node.type == NodeType.AGENT else None
+        ),
+        "inputs": [
+            (
+                mapping.get("source_node"),
+                compile_mapping_key(mapping.get("source_key", "output")),
+                mapping.get("target_key")
+            )
+            for mapping in node.config.get("input_mappings", [])
+        ],
+        "outputs": [
+            (
+                compile_mapping_key(mapping.get("source_key", "output")),
+                mapping.get("target_key")
+            )
+            for mapping in node.config.get("output_mappings", [])
+        ]
+    }
+
+
+def get_execution_plan(workflow: WorkflowGraph) -> Dict[str, Dict[str, Any]]:
+    """Get the compiled per-node execution plan for a workflow graph"""
+    if workflow.execution_plan is None:
+        workflow.execution_plan = {
+            node_id: compile_node_plan(node)
+            for node_id, node in workflow.nodes.items()
+        }
+    
+    return workflow.execution_plan
+
+
 # Helper functions to build workflow graphs
 
+# Only {identifier} fields are placeholders and {{ / }} are escapes; any other brace,
+# such as a JSON example, a stray "}" or "{x!r}", is kept verbatim
+_QUERY_FIELD_PATTERN = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def parse_query_template(query: str) -> List[Tuple[str, Optional[str]]]:
+    """Split a query template into (literal, field_name) pairs"""
+    parts = []
+    literal = []
+    position = 0
+    for match in _QUERY_FIELD_PATTERN.finditer(query):
+        literal.append(query[position:match.start()])
+        position = match.end()
+        
+        field_name = match.group(1)
+        if field_name is None:
+            # Escaped brace
+            literal.append(match.group(0)[0])
+        else:
+            parts.append(("".join(literal), field_name))
+            literal = []
+    
+    literal.append(query[position:])
+    parts.append(("".join(literal), None))
+    return parts
+
+
+def render_query_template(parts: List[Tuple[str, Optional[str]]], context: Dict[str, Any]) -> str:
+    """Render pre-parsed query template parts against a context"""
+    rendered = []
+    for literal, field_name in parts:
+        rendered.append(literal)
+        if field_name:
+            # Leave unresolved placeholders intact rather than failing the node
+            value = context.get(field_name)
+            rendered.append(str(value) if value is not None else "{" + field_name + "}")
+    
+    return "".join(rendered)
+
+
 def create_workflow(name: str, description: str = "") -> WorkflowGraph:
     """Create a new workflow graph"""
     graph = WorkflowGraph(name, description)
@@ -369,8 +390,14 @@ def create_workflow(name: str, description: str = "") -> WorkflowGraph:
 
 
 def add_agent_node(graph: WorkflowGraph, id: str, name: str, agent_name: str, 
-                   agent_type: str, query: str, **kwargs) -> str:
+                   agent_type: str, query: str, cacheable_prefix: str = "", **kwargs) -> str:
     """Add an agent node to the workflow graph"""
+    # A cacheable prefix goes verbatim ahead of the query template so every
+    # rendering starts with the same text for backends with prefix caching
+    if cacheable_prefix:
+        escaped_prefix = cacheable_prefix.replace("{", "{{").replace("}", "}}")
+        query = escaped_prefix + query
+    
     node = WorkflowNode(
         id=id,
         type=NodeType.AGENT,
@@ -8,6 +8,7 @@ iterative reasoning.
 
 from typing import Dict, List, Optional, Any, Callable, Set, Union, Tuple
 import asyncio
+import itertools
 import logging
 from uuid import UUID, uuid4
 from enum import Enum
@@ -81,10 +82,21 @@ class WorkflowGraph:
         self.edges: List[WorkflowEdge] = []
         self.start_node: Optional[str] = None
         self.end_nodes: Set[str] = set()
+        
+        # Compressed successor index (CSR), rebuilt lazily after graph changes
+        self._node_index: Dict[str, int] = {}
+        self._succ_offsets: Optional[List[int]] = None
+        self._succ_edges: List[WorkflowEdge] = []
+        
+        # Compiled per-node execution plan, built by the engine on first run and
+        # dropped whenever a node is added or its config is changed through update_node
+        self.execution_plan: Optional[Dict[str, Dict[str, Any]]] = None
     
     def add_node(self, node: WorkflowNode) -> str:
         """Add a node to the workflow graph"""
         self.nodes[node.id] = node
+        self._succ_offsets = None
+        self.execution_plan = None
         
         # Set start and end nodes if applicable
         if node.type == NodeType.START:
@@ -97,6 +109,14 @@ class WorkflowGraph:
         
         return node.id
     
+    def update_node(self, node_id: str, config: Dict[str, Any]) -> None:
+        """Update a node's config, so the next run recompiles its query and mappings"""
+        if node_id not in self.nodes:
+            raise ValueError(f"Node {node_id} not found in graph")
+        
+        self.nodes[node_id].config.update(config)
+        self.execution_plan = None
+    
     def add_edge(self, edge: WorkflowEdge) -> None:
         """Add an edge to the workflow graph"""
         # Validate the edge
@@ -107,6 +127,39 @@ class WorkflowGraph:
             raise ValueError(f"Target node {edge.target_node} not found in graph")
         
         self.edges.append(edge)
+        self._succ_offsets = None
+    
+    def finalize(self) -> None:
+        """Build the compressed successor index used for edge traversal"""
+        self._node_index = {node_id: index for index, node_id in enumerate(self.nodes)}
+        
+        # Count outgoing edges per node, then prefix-sum into row offsets
+        counts = [0] * (len(self.nodes) + 1)
+        for edge in self.edges:
+            counts[self._node_index[edge.source_node] + 1] += 1
+        offsets = list(itertools.accumulate(counts))
+        
+        # Place each edge in its source node's row, preserving insertion order
+        succ_edges = [None] * len(self.edges)
+        next_slot = offsets[:-1]
+        for edge in self.edges:
+            index = self._node_index[edge.source_node]
+            succ_edges[next_slot[index]] = edge
+            next_slot[index] += 1
+        
+        self._succ_offsets = offsets
+        self._succ_edges = succ_edges
+    
+    def get_outgoing_edges(self, node_id: str) -> List[WorkflowEdge]:
+        """Get the edges leaving the given node"""
+        if self._succ_offsets is None:
+            self.finalize()
+        
+        index = self._node_index.get(node_id)
+        if index is None:
+            return []
+        
+        return self._succ_edges[self._succ_offsets[index]:self._succ_offsets[index + 1]]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the graph to a dictionary representation"""
@@ -168,10 +221,7 @@ class WorkflowGraph:
         """Get the next nodes to execute after the given node"""
         next_nodes = []
         
-        for edge in self.edges:
-            if edge.source_node != node_id:
-                continue
-            
+        for edge in self.get_outgoing_edges(node_id):
             # Check if edge condition is met
             condition_met = False
             
@@ -209,8 +259,8 @@ class WorkflowGraph:
             current_node = nodes_to_check.pop()
             reachable_nodes.add(current_node)
             
-            for edge in self.edges:
-                if edge.source_node == current_node and edge.target_node not in reachable_nodes:
+            for edge in self.get_outgoing_edges(current_node):
+                if edge.target_node not in reachable_nodes:
                     nodes_to_check.add(edge.target_node)
         
         unreachable = set(self.nodes.keys()) - reachable_nodes
@@ -232,13 +282,12 @@ class WorkflowGraph:
         visited.add(node_id)
         stack.add(node_id)
         
-        for edge in self.edges:
-            if edge.source_node == node_id:
-                if edge.target_node not in visited:
-                    if self._has_cycle(edge.target_node, visited, stack):
-                        return True
-                elif edge.target_node in stack:
+        for edge in self.get_outgoing_edges(node_id):
+            if edge.target_node not in visited:
+                if self._has_cycle(edge.target_node, visited, stack):
                     return True
+            elif edge.target_node in stack:
+                return True
         
         stack.remove(node_id)
         return False 
\ No newline at end of file
@@ -6,16 +6,21 @@ making them discoverable and reusable across the application.
 """
 
 from typing import Dict, List, Optional, Any, Callable, Set, Union
-import json
+import functools
 import os
 import logging
 from datetime import datetime
+from pathlib import Path
 from uuid import UUID, uuid4
 
 from .graph_engine import WorkflowGraph
+from ...utils.json_utils import load_json_file, save_json_file
 
 logger = logging.getLogger(__name__)
 
+# Default storage location for the shared workflow registry
+WORKFLOW_REGISTRY_DIR = Path(os.environ.get("GENIUS_WF_DIR", "./data/workflows"))
+
 
 class WorkflowRegistry:
     """Registry for managing and storing workflow definitions"""
@@ -192,8 +197,7 @@ class WorkflowRegistry:
         
         # Save to file
         workflow_path = os.path.join(self.storage_path, f"{workflow_id}.json")
-        with open(workflow_path, "w") as f:
-            json.dump(storage_data, f, indent=2)
+        save_json_file(workflow_path, storage_data)
         
         logger.info(f"Saved workflow to: {workflow_path}")
     
@@ -202,32 +206,37 @@ class WorkflowRegistry:
         if not self.storage_path:
             return
         
+        workflow = self.workflows.get(workflow_id)
         metadata = self.metadata.get(workflow_id)
         
-        if not metadata:
+        if not workflow or not metadata:
             return
         
-        # Load existing data
         workflow_path = os.path.join(self.storage_path, f"{workflow_id}.json")
         if not os.path.exists(workflow_path):
             return
         
         try:
-            with open(workflow_path, "r") as f:
-                storage_data = json.load(f)
-            
-            # Update metadata
-            storage_data["metadata"] = metadata
+            # The in-memory graph is the source of truth for the stored file,
+            # so rewrite it directly instead of re-reading it from disk
+            storage_data = {
+                "metadata": metadata,
+                "workflow": workflow.to_dict()
+            }
             
-            # Save back to file
-            with open(workflow_path, "w") as f:
-                json.dump(storage_data, f, indent=2)
+            save_json_file(workflow_path, storage_data)
             
             logger.debug(f"Updated workflow metadata: {workflow_path}")
         
         except Exception as e:
             logger.error(f"Error updating workflow metadata: {e}")
     
+    def reload(self) -> None:
+        """Reload all workflows from persistent storage, dropping any that are no longer stored"""
+        self.workflows = {}
+        self.metadata = {}
+        self._load_workflows()
+    
     def _load_workflows(self) -> None:
         """Load all workflows from persistent storage"""
         if not self.storage_path or not os.path.exists(self.storage_path):
@@ -242,8 +251,7 @@ class WorkflowRegistry:
         for workflow_file in workflow_files:
             try:
                 # Load the workflow data
-                with open(os.path.join(self.storage_path, workflow_file), "r") as f:
-                    storage_data = json.load(f)
+                storage_data = load_json_file(os.path.join(self.storage_path, workflow_file))
                 
                 # Extract metadata and workflow
                 metadata = storage_data.get("metadata", {})
@@ -269,15 +277,13 @@ class WorkflowRegistry:
                 logger.error(f"Error loading workflow from {workflow_file}: {e}")
 
 
-# Global workflow registry instance
-workflow_registry = None
+@functools.lru_cache(maxsize=8)
+def _workflow_registry_for(storage_path: Optional[str]) -> WorkflowRegistry:
+    """Create the shared registry for a storage location"""
+    return WorkflowRegistry(storage_path)
 
 
-def get_workflow_registry(storage_path: str = None) -> WorkflowRegistry:
-    """Get the global workflow registry instance"""
-    global workflow_registry
-    
-    if workflow_registry is None:
-        workflow_registry = WorkflowRegistry(storage_path)
-    
-    return workflow_registry 
\ No newline at end of file
+def get_workflow_registry(storage_path: Union[str, Path] = None) -> WorkflowRegistry:
+    """Get the shared workflow registry for a storage location, loading it only once"""
+    # Relative and absolute spellings of one directory share a registry
+    return _workflow_registry_for(os.path.abspath(storage_path) if storage_path is not None else None) 
\ No newline at end of file
@@ -5,7 +5,7 @@ This module defines a reusable workflow template for SEO content optimization
 that leverages multiple agents and tools in a coordinated workflow.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import asyncio
 import logging
 
@@ -20,7 +20,7 @@ from ..engine import (
     add_merge_node,
     connect_nodes
 )
-from ..registry import get_workflow_registry
+from ..registry import WORKFLOW_REGISTRY_DIR, WorkflowRegistry, get_workflow_registry
 
 
 logger = logging.getLogger(__name__)
@@ -42,8 +42,9 @@ def create_seo_workflow_template() -> str:
         name="Topic Research",
         agent_name="seo_analyst",
         agent_type="react",
-        query="Research the most relevant keywords and topics for {content_topic}. "
-              "Focus on search volume, competition, and user intent.",
+        cacheable_prefix="Research the most relevant keywords and topics for the content topic below. "
+                         "Focus on search volume, competition, and user intent.\n\n",
+        query="Content topic: {content_topic}",
         max_steps=5
     )
     
@@ -54,8 +55,9 @@ def create_seo_workflow_template() -> str:
         name="Competitor Analysis",
         agent_name="seo_analyst",
         agent_type="react",
-        query="Analyze the top 3 competing content pieces for {primary_keyword}. "
-              "Identify content gaps, structure, and unique selling points.",
+        cacheable_prefix="Analyze the top 3 competing content pieces for the primary keyword below. "
+                         "Identify content gaps, structure, and unique selling points.\n\n",
+        query="Primary keyword: {primary_keyword}",
         max_steps=5,
         input_mappings=[
             {
@@ -73,8 +75,9 @@ def create_seo_workflow_template() -> str:
         name="Content Outline Creation",
         agent_name="content_strategist",
         agent_type="react",
-        query="Create a detailed content outline for {content_topic} targeting {primary_keyword}. "
-              "Include headings, subheadings, and key points for each section.",
+        cacheable_prefix="Create a detailed content outline for the content topic below, targeting the primary keyword. "
+                         "Include headings, subheadings, and key points for each section.\n\n",
+        query="Content topic: {content_topic}\nPrimary keyword: {primary_keyword}",
         max_steps=7,
         input_mappings=[
             {
@@ -254,8 +257,11 @@ def create_seo_workflow_template() -> str:
     connect_nodes(workflow, content_revision, final_review, 
                  condition=EdgeCondition.FAILURE)
     
+    # Build the successor index once the graph is complete
+    workflow.finalize()
+    
     # Register the workflow as a template
-    registry = get_workflow_registry("./data/workflows")
+    registry = get_workflow_registry(WORKFLOW_REGISTRY_DIR)
     workflow_id = registry.register_workflow(
         workflow=workflow,
         tags=["seo", "content", "marketing"],
@@ -263,14 +269,16 @@ def create_seo_workflow_template() -> str:
         version="1.0.0"
     )
     
-    logger.info(f"Registered SEO workflow template with ID: {workflow_id}")
+    logger.info("Registered SEO workflow template with ID: %s", workflow_id)
     
     return workflow_id
 
 
-def create_seo_workflow_instance(content_topic: str, instance_name: str = None) -> Dict[str, Any]:
+def create_seo_workflow_instance(content_topic: str, instance_name: str = None,
+                                 registry: Optional[WorkflowRegistry] = None) -> Dict[str, Any]:
     """Create an instance of the SEO workflow for a specific content topic"""
-    registry = get_workflow_registry("./data/workflows")
+    if registry is None:
+        registry = get_workflow_registry(WORKFLOW_REGISTRY_DIR)
     
     # Create a name for the instance if not provided
     if not instance_name:
@@ -303,14 +311,16 @@ async def run_seo_workflow(content_topic: str, agent_registry: Dict[str, Any],
     """Run the SEO workflow for a specific content topic"""
     from ..engine import GraphWorkflowEngine
     
+    # Look up the registry once and share it with instance creation
+    registry = get_workflow_registry(WORKFLOW_REGISTRY_DIR)
+    
     # Create a workflow instance
-    instance_info = create_seo_workflow_instance(content_topic)
+    instance_info = create_seo_workflow_instance(content_topic, registry=registry)
     
     if "error" in instance_info:
         return instance_info
     
     # Get the workflow
-    registry = get_workflow_registry("./data/workflows")
     workflow = registry.get_workflow(instance_info["workflow_id"])
     
     if not workflow:
@@ -337,7 +347,7 @@ async def run_seo_workflow(content_topic: str, agent_registry: Dict[str, Any],
         }
     
     except Exception as e:
-        logger.error(f"Error executing SEO workflow: {e}")
+        logger.error("Error executing SEO workflow: %s", e)
         return {
             "workflow_id": instance_info["workflow_id"],
             "status": "error",
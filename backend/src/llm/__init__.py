@@ -3,16 +3,30 @@ LLM module for the AgentForge OSS framework.
 This module provides unified interfaces for different LLM backends.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 import os
-import json
+import threading
 
 from ..agents.core.agent_types import LLMBackendType, LLMConfig, Task
 from .metrics_util import ModelMetricsCollector, measure_execution, estimate_tokens
+from ..utils.json_utils import load_json_file, save_json_file
 
 logger = logging.getLogger(__name__)
 
+# Router shared by all callers, rebuilt only when the models configuration changes
+_shared_router: Optional['ModelRouter'] = None
+_shared_router_key: Optional[Tuple[int, int]] = None
+_shared_router_lock = threading.Lock()
+
+def _config_file_key(path: str) -> Optional[Tuple[int, int]]:
+    """Identify a version of a file by modification time and size"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
 def get_llm_backend(config: LLMConfig) -> 'BaseLLM':
     """Factory function to get the appropriate LLM backend"""
     if config.backend == LLMBackendType.VLLM:
@@ -29,29 +43,39 @@ def get_llm_backend(config: LLMConfig) -> 'BaseLLM':
 
 def get_model_router() -> 'ModelRouter':
     """Get the model router with available models configuration"""
+    global _shared_router, _shared_router_key
     from .model_router import ModelRouter
     
-    # Load models configuration
     config_path = os.path.join(os.path.dirname(__file__), "models_config.json")
     
+    with _shared_router_lock:
+        # Reuse the router, and the metrics and history it loaded, while the configuration is unchanged
+        config_key = _config_file_key(config_path)
+        if _shared_router is not None and config_key == _shared_router_key:
+            return _shared_router
+        
+        _shared_router = ModelRouter(_load_models_config(config_path))
+        _shared_router_key = _config_file_key(config_path)
+        return _shared_router
+
+def _load_models_config(config_path: str) -> List[Dict[str, Any]]:
+    """Load the models configuration, saving the defaults if none exists"""
     if os.path.exists(config_path):
         try:
-            with open(config_path, "r") as f:
-                models_config = json.load(f)
-            logger.info(f"Loaded configuration for {len(models_config)} models")
+            models_config = load_json_file(config_path)
+            logger.info("Loaded configuration for %d models", len(models_config))
         except Exception as e:
-            logger.error(f"Error loading models configuration: {e}")
+            logger.error("Error loading models configuration: %s", e)
             models_config = get_default_models_config()
     else:
         models_config = get_default_models_config()
         # Save default config
         try:
-            with open(config_path, "w") as f:
-                json.dump(models_config, f, indent=2)
+            save_json_file(config_path, models_config)
         except Exception as e:
-            logger.error(f"Error saving default models configuration: {e}")
+            logger.error("Error saving default models configuration: %s", e)
     
-    return ModelRouter(models_config)
+    return models_config
 
 def get_default_models_config() -> List[Dict[str, Any]]:
     """Get default models configuration"""
@@ -9,6 +9,10 @@ from typing import Dict, Any, Callable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Translation table that deletes punctuation counted as standalone tokens,
+# built once so estimate_tokens can count them with a single C-level pass
+_PUNCTUATION_DELETE_TABLE = str.maketrans("", "", ".,;:!?()[]{}-\"'")
+
 class ModelMetricsCollector:
     """Utility class for collecting model performance metrics"""
     
@@ -134,7 +138,7 @@ def estimate_tokens(text: str, model_name: Optional[str] = None) -> int:
     # Simple estimation based on whitespace and punctuation
     # In production, use the actual tokenizer for the model
     words = text.split()
-    punctuation_count = sum(1 for c in text if c in ".,;:!?()[]{}-\"'")
+    punctuation_count = len(text) - len(text.translate(_PUNCTUATION_DELETE_TABLE))
     
     # Rough estimate: each word is ~1.3 tokens, and punctuation is 1 token each
     return int(len(words) * 1.3) + punctuation_count
@@ -6,13 +6,13 @@ It provides a consistent way to handle context, function calling, and model resp
 across various model providers and implementations.
 """
 
-from typing import Dict, List, Optional, Union, Any, Callable
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Tuple, Union, Any, Callable
 from enum import Enum
-from dataclasses import dataclass, field
-from pydantic import BaseModel, Field
+from dataclasses import InitVar, dataclass, field
 
 
-class FunctionParameter(BaseModel):
+@dataclass(frozen=True, slots=True)
+class FunctionParameter:
     """Definition of a function parameter for LLM function calling"""
     name: str
     description: str
@@ -20,13 +20,91 @@ class FunctionParameter(BaseModel):
     required: bool = False
     enum: Optional[List[str]] = None
     default: Optional[Any] = None
+    
+    def to_json_schema(self) -> Dict[str, Any]:
+        """Convert the parameter to a JSON schema property"""
+        schema = {"type": self.type, "description": self.description}
+        
+        if self.enum is not None:
+            schema["enum"] = self.enum
+        
+        if self.default is not None:
+            schema["default"] = self.default
+        
+        return schema
 
 
-class FunctionDefinition(BaseModel):
+@dataclass(frozen=True, slots=True)
+class FunctionDefinition:
     """Definition of a function for LLM function calling"""
     name: str
     description: str
     parameters: List[FunctionParameter]
+    # Prompt line for each parameter, rendered once when the definition is created
+    param_lines: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Render the parameter descriptions used in function calling prompts"""
+        object.__setattr__(self, "param_lines", tuple(
+            f"- {param.name}: {param.description} ({param.type}, "
+            f"{'required' if param.required else 'optional'})"
+            for param in self.parameters
+        ))
+    
+    @classmethod
+    def from_json_schema(cls, schema: Dict[str, Any]) -> 'FunctionDefinition':
+        """Validate an OpenAI-style function schema and create a definition from it"""
+        name = schema.get("name")
+        if not isinstance(name, str) or not name:
+            raise ValueError("Function schema must have a non-empty name")
+        
+        parameters_schema = schema.get("parameters") or {}
+        properties = parameters_schema.get("properties", {})
+        if not isinstance(properties, dict):
+            raise ValueError(f"Parameters of function {name} must be an object")
+        
+        required = set(parameters_schema.get("required", []))
+        
+        parameters = []
+        for param_name, param_schema in properties.items():
+            if not isinstance(param_schema, dict):
+                raise ValueError(f"Parameter {param_name} of function {name} must be an object")
+            
+            enum = param_schema.get("enum")
+            parameters.append(FunctionParameter(
+                name=param_name,
+                description=str(param_schema.get("description", "")),
+                type=str(param_schema.get("type", "string")),
+                required=param_name in required,
+                enum=[str(value) for value in enum] if enum is not None else None,
+                default=param_schema.get("default")
+            ))
+        
+        return cls(
+            name=name,
+            description=str(schema.get("description", "")),
+            parameters=parameters
+        )
+    
+    def to_openai_schema(self) -> Dict[str, Any]:
+        """Convert the definition to an OpenAI-style function schema"""
+        # Properties and required names are collected in a single pass over the parameters
+        properties = {}
+        required = []
+        for param in self.parameters:
+            properties[param.name] = param.to_json_schema()
+            if param.required:
+                required.append(param.name)
+        
+        return {
+            "name": self.name,
+            "description": self.description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required
+            }
+        }
 
 
 class ModelCapability(str, Enum):
@@ -43,8 +121,8 @@ class ModelCapability(str, Enum):
 @dataclass
 class ModelContext:
     """Standard context container for model interactions"""
-    # Core components
-    messages: List[Dict[str, Any]] = field(default_factory=list)
+    # Core components; initial messages are stored in the parallel lists below
+    messages: InitVar[Optional[List[Dict[str, Any]]]] = None
     functions: List[FunctionDefinition] = field(default_factory=list)
     
     # Context management
@@ -62,66 +140,131 @@ class ModelContext:
     # Execution context
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # Message storage, kept as parallel per-field lists rather than a list of dicts
+    _roles: List[str] = field(default_factory=list, init=False, repr=False)
+    _contents: List[Optional[str]] = field(default_factory=list, init=False, repr=False)
+    _function_calls: List[Optional[Dict[str, Any]]] = field(default_factory=list, init=False, repr=False)
+    _function_names: List[Optional[str]] = field(default_factory=list, init=False, repr=False)
+    
+    def __post_init__(self, messages: Optional[List[Dict[str, Any]]]) -> None:
+        """Store the initial messages"""
+        if messages:
+            self._set_messages(messages)
+    
+    def _get_messages(self) -> Tuple[Dict[str, Any], ...]:
+        """Messages in chat API format, built on access as a read-only tuple"""
+        messages = []
+        for role, content, function_call, name in zip(
+            self._roles, self._contents, self._function_calls, self._function_names
+        ):
+            message = {"role": role, "content": content}
+            
+            if name is not None:
+                message["name"] = name
+            
+            if function_call is not None:
+                message["function_call"] = function_call
+            
+            messages.append(message)
+        
+        return tuple(messages)
+    
+    def _set_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """Replace all messages from chat API format"""
+        self._roles = [m["role"] for m in messages]
+        self._contents = [m.get("content") for m in messages]
+        self._function_calls = [m.get("function_call") for m in messages]
+        self._function_names = [m.get("name") for m in messages]
+    
+    def _append_message(self, role: str, content: Optional[str],
+                        function_call: Optional[Dict[str, Any]] = None,
+                        name: Optional[str] = None) -> None:
+        """Append a message to the parallel message lists"""
+        self._roles.append(role)
+        self._contents.append(content)
+        self._function_calls.append(function_call)
+        self._function_names.append(name)
+    
     def add_user_message(self, content: str) -> None:
         """Add a user message to the context"""
-        self.messages.append({"role": "user", "content": content})
+        self._append_message("user", content)
     
     def add_assistant_message(self, content: str) -> None:
         """Add an assistant message to the context"""
-        self.messages.append({"role": "assistant", "content": content})
+        self._append_message("assistant", content)
     
     def add_system_message(self, content: str) -> None:
         """Add a system message to the context"""
-        self.messages.append({"role": "system", "content": content})
+        self._append_message("system", content)
     
     def add_function_call(self, function_name: str, arguments: Dict[str, Any]) -> None:
         """Add a function call to the context"""
-        self.messages.append({
-            "role": "assistant", 
-            "content": None,
-            "function_call": {
+        self._append_message(
+            "assistant",
+            None,
+            function_call={
                 "name": function_name,
                 "arguments": arguments
             }
-        })
+        )
     
     def add_function_result(self, function_name: str, result: Any) -> None:
         """Add a function result to the context"""
-        self.messages.append({
-            "role": "function", 
-            "name": function_name,
-            "content": str(result)
-        })
+        self._append_message("function", str(result), name=function_name)
     
-    def register_function(self, function_def: FunctionDefinition) -> None:
+    def get_content_length(self) -> int:
+        """Get the total number of characters across all message contents"""
+        return sum(len(content) for content in self._contents if content)
+    
+    def register_function(self, function_def: Union[FunctionDefinition, Dict[str, Any]]) -> None:
         """Register a function for the model to call"""
+        # Raw schemas are validated once here; definitions are trusted as-is
+        if isinstance(function_def, dict):
+            function_def = FunctionDefinition.from_json_schema(function_def)
+        
         self.functions.append(function_def)
     
     def clear(self) -> None:
         """Clear all messages while preserving system prompt and functions"""
-        system_messages = [m for m in self.messages if m["role"] == "system"]
-        self.messages = system_messages
+        system_indices = [i for i, role in enumerate(self._roles) if role == "system"]
+        self._roles = [self._roles[i] for i in system_indices]
+        self._contents = [self._contents[i] for i in system_indices]
+        self._function_calls = [self._function_calls[i] for i in system_indices]
+        self._function_names = [self._function_names[i] for i in system_indices]
         self.used_tokens = 0
 
 
+# Set after the dataclass is built, so the property doesn't become the default of the
+# messages init parameter. Reads return a tuple, so appending to it fails loudly instead
+# of being lost; use the add_* methods or assign a new list.
+ModelContext.messages = property(ModelContext._get_messages, ModelContext._set_messages)
+
+
 class ModelContextProtocol:
     """Protocol adapter for different LLM backends"""
     
+    __slots__ = ("model_name", "model_config", "capabilities")
+    
     def __init__(self, model_name: str, model_config: Dict[str, Any] = None):
         """Initialize the protocol with model configuration"""
         self.model_name = model_name
         self.model_config = model_config or {}
         self.capabilities = self._detect_capabilities()
     
-    def _detect_capabilities(self) -> List[ModelCapability]:
+    def _detect_capabilities(self) -> FrozenSet[ModelCapability]:
         """Detect capabilities of the current model"""
         # This should be implemented by specific adapters
-        return []
+        return frozenset()
     
     async def generate_completion(self, context: ModelContext) -> str:
         """Generate a text completion using the provided context"""
         raise NotImplementedError("Must be implemented by adapter")
     
+    async def stream_completion(self, context: ModelContext) -> AsyncIterator[str]:
+        """Generate a text completion, yielding text as it becomes available"""
+        # Adapters without incremental output yield the whole completion at once
+        yield await self.generate_completion(context)
+    
     async def generate_chat_response(self, context: ModelContext) -> Dict[str, Any]:
         """Generate a chat response with possible function calls"""
         raise NotImplementedError("Must be implemented by adapter")
@@ -135,6 +278,10 @@ class ModelContextProtocol:
         # Simple approximation - should be overridden by specific adapters
         return len(text.split()) * 1.3
     
+    def estimate_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Estimate the number of tokens in each of the texts"""
+        return [self.estimate_tokens(text) for text in texts]
+    
     def get_max_context_size(self) -> int:
         """Get the maximum context size for this model"""
         return self.model_config.get("max_context_size", 8192) 
\ No newline at end of file
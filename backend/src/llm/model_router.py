@@ -3,17 +3,196 @@ Model Router for the AgentForge OSS framework.
 This module dynamically selects the best model for a given task.
 """
 
+import atexit
+import functools
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-import json
-import os
+import re
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable
+import threading
 import time
-from datetime import datetime
+import weakref
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
 
 from ..agents.core.agent_types import LLMConfig, LLMBackendType, Task
+from ..utils.json_utils import dumps_json, loads_json
 
 logger = logging.getLogger(__name__)
 
+# Keywords the task heuristics look for in a query
+_TASK_KEYWORDS = (
+    # Task types
+    "summarize", "summary", "translate", "code", "function", "programming",
+    "search", "find information", "creative", "write a story", "poem",
+    "analyze", "data",
+    # Reasoning types
+    "why", "explain", "reason", "compare", "difference between", "step by step",
+    "how to", "predict", "forecast", "future", "ethics", "moral", "should",
+    "imagine", "generate",
+    # Response length hints
+    "brief", "short", "detailed", "comprehensive",
+    # Real-time constraints
+    "urgent", "immediate",
+)
+
+# Single alternation matched at every position via lookahead, so one scan
+# reports every keyword occurrence, including overlapping ones
+_TASK_KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in sorted(_TASK_KEYWORDS, key=len, reverse=True)) + "))"
+)
+
+# Capability flags used in scoring, in capability matrix column order
+_CAPABILITY_KEYS = (
+    "handles_complex_tasks",
+    "handles_medium_tasks",
+    "multi_agent_coordination",
+    "human_interaction",
+    "handles_long_generation",
+    "efficient_short_responses",
+    "causal_reasoning",
+    "comparative_reasoning",
+    "procedural_reasoning",
+    "predictive_reasoning",
+    "ethical_reasoning",
+    "creative_reasoning",
+    "logical_reasoning",
+)
+_CAPABILITY_INDEX = {key: i for i, key in enumerate(_CAPABILITY_KEYS)}
+
+# Metrics tracked as moving averages, with the value assumed before any update
+_EMA_METRIC_KEYS = ("success_rate", "avg_latency", "accuracy", "token_efficiency")
+_EMA_METRIC_DEFAULTS = (0.5, 1000, 0.5, 0.5)
+
+# Persisted router state, stored next to this module
+_MODEL_METRICS_PATH = Path(__file__).parent / "model_metrics.json"
+_TASK_HISTORY_PATH = Path(__file__).parent / "task_history.json"
+
+# Task complexity indexed by (any feature over the high threshold) << 1 | (any over the medium one)
+_COMPLEXITY_LEVELS = ("low", "medium", "high", "high")
+
+# Context size above which a task counts as high complexity; sizing stops past it
+_CONTEXT_SIZE_LIMIT = 10001
+
+
+def _approx_context_size(obj: Any, limit: int) -> int:
+    """Approximate len(json.dumps(obj)) without serializing, stopping once limit is reached"""
+    size = 0
+    stack = [obj]
+    while stack and size < limit:
+        item = stack.pop()
+        if isinstance(item, str):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            # Braces, plus quotes, ": " and ", " around each key
+            size += 2 + sum(len(str(key)) + 6 for key in item) - (2 if item else 0)
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            size += 2 + 2 * len(item) - (2 if item else 0)
+            stack.extend(item)
+        elif item is None:
+            size += 4
+        elif isinstance(item, bool):
+            size += 4 if item else 5
+        else:
+            size += len(str(item))
+    return size
+
+
+@dataclass(frozen=True, slots=True)
+class ModelSpec:
+    """Read-only typed view of one models_config entry"""
+    name: str
+    backend: str
+    model_path: str
+    capabilities: Dict[str, bool] = field(default_factory=dict)
+    resource_efficiency: float = 0.5
+    tensor_parallel_size: int = 1
+    quantization: Optional[str] = None
+    temperature: float = 0.7
+    max_tokens: int = 2048
+    top_p: float = 0.95
+    top_k: int = 50
+    extra_params: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def from_config(cls, model_conf: Dict[str, Any]) -> 'ModelSpec':
+        """Create a spec from a model configuration, ignoring unknown keys"""
+        return cls(**{key: model_conf[key] for key in _MODEL_SPEC_FIELDS if key in model_conf})
+
+
+_MODEL_SPEC_FIELDS = tuple(spec_field.name for spec_field in fields(ModelSpec))
+
+# Writers with state that may still need flushing at interpreter exit
+_live_writers = weakref.WeakSet()
+
+@atexit.register
+def _flush_live_writers():
+    """Flush any pending router state before the process exits"""
+    for writer in list(_live_writers):
+        writer.flush()
+
+class _PersistenceWriter:
+    """
+    Background writer that coalesces state saves off the request path.
+    
+    Callers mark a state key dirty; a daemon thread flushes every dirty key
+    once per interval, so any number of updates in between cost one write.
+    The thread exits once nothing is left to write.
+    """
+    
+    def __init__(self, flush_interval: float = 1.0):
+        """
+        Initialize the persistence writer.
+        
+        Args:
+            flush_interval: Seconds between background flushes
+        """
+        self.flush_interval = flush_interval
+        self._savers: Dict[str, Callable[[], None]] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        _live_writers.add(self)
+    
+    def register(self, key: str, save_func: Callable[[], None]):
+        """Register the function that persists a state key"""
+        self._savers[key] = save_func
+    
+    def mark_dirty(self, key: str):
+        """Schedule a state key to be written on the next flush"""
+        with self._lock:
+            self._dirty.add(key)
+            
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="model-router-persistence",
+                    daemon=True
+                )
+                self._thread.start()
+    
+    def flush(self):
+        """Write all dirty state keys now"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        
+        for key in dirty:
+            self._savers[key]()
+    
+    def _run(self):
+        """Flush dirty state periodically until none is left"""
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            
+            with self._lock:
+                if not self._dirty:
+                    self._thread = None
+                    return
+
 class ModelRouter:
     """
     Model Router that dynamically selects the best model for a task.
@@ -31,47 +210,58 @@ class ModelRouter:
         self.model_metrics = {}  # Track performance metrics for each model
         self.task_history = {}   # Track model performance per task type
         self.model_usage = {}    # Track model usage statistics
-        self.last_evaluation = datetime.now()
+        
+        # Timestamps are kept as monotonic nanoseconds and converted to wall clock
+        # time through this anchor only when read
+        self._clock_anchor_ns = time.monotonic_ns()
+        self._clock_anchor = datetime.now()
+        self._last_evaluation_ns = self._clock_anchor_ns
+        
+        # Guards the metrics/history dicts against concurrent serialization
+        self._state_lock = threading.Lock()
+        self._persistence = _PersistenceWriter()
+        self._persistence.register("model_metrics", self._save_model_metrics)
+        self._persistence.register("task_history", self._save_task_history)
+        
         self._load_model_metrics()
         self._load_task_history()
+        self._build_model_arrays()
     
     def _load_model_metrics(self):
         """Load stored model performance metrics if available"""
-        metrics_path = os.path.join(os.path.dirname(__file__), "model_metrics.json")
-        if os.path.exists(metrics_path):
+        if _MODEL_METRICS_PATH.is_file():
             try:
-                with open(metrics_path, "r") as f:
-                    self.model_metrics = json.load(f)
+                self.model_metrics = loads_json(_MODEL_METRICS_PATH.read_bytes())
                 logger.info(f"Loaded metrics for {len(self.model_metrics)} models")
             except Exception as e:
                 logger.error(f"Error loading model metrics: {e}")
     
     def _load_task_history(self):
         """Load stored task history if available"""
-        history_path = os.path.join(os.path.dirname(__file__), "task_history.json")
-        if os.path.exists(history_path):
+        if _TASK_HISTORY_PATH.is_file():
             try:
-                with open(history_path, "r") as f:
-                    self.task_history = json.load(f)
+                self.task_history = loads_json(_TASK_HISTORY_PATH.read_bytes())
                 logger.info(f"Loaded history for {len(self.task_history)} task types")
             except Exception as e:
                 logger.error(f"Error loading task history: {e}")
     
     def _save_model_metrics(self):
         """Save model performance metrics"""
-        metrics_path = os.path.join(os.path.dirname(__file__), "model_metrics.json")
         try:
-            with open(metrics_path, "w") as f:
-                json.dump(self.model_metrics, f)
+            with self._state_lock:
+                data = dumps_json(self.model_metrics)
+            with open(_MODEL_METRICS_PATH, "wb") as f:
+                f.write(data)
         except Exception as e:
             logger.error(f"Error saving model metrics: {e}")
     
     def _save_task_history(self):
         """Save task history"""
-        history_path = os.path.join(os.path.dirname(__file__), "task_history.json")
         try:
-            with open(history_path, "w") as f:
-                json.dump(self.task_history, f)
+            with self._state_lock:
+                data = dumps_json(self.task_history)
+            with open(_TASK_HISTORY_PATH, "wb") as f:
+                f.write(data)
         except Exception as e:
             logger.error(f"Error saving task history: {e}")
     
@@ -86,6 +276,24 @@ class ModelRouter:
         Returns:
             Tuple of (selected LLM config, reason for selection)
         """
+        return self.select_models_ranked(task, context, k=1)[0]
+    
+    def select_models_ranked(self, task: Task, context: Dict[str, Any],
+                             k: int = 3) -> List[Tuple[LLMConfig, str]]:
+        """
+        Select the k best models for a given task, best first.
+        
+        Callers can try the first model and fall back to the next ones on
+        failure. Only the top model is recorded as selected.
+        
+        Args:
+            task: The task to be performed
+            context: Additional context for model selection
+            k: Maximum number of models to return
+            
+        Returns:
+            List of (LLM config, reason for selection) tuples, best first
+        """
         # Extract task features for model selection
         task_features = self._extract_task_features(task, context)
         
@@ -93,52 +301,50 @@ class ModelRouter:
         task_type = task_features.get("task_type", "general")
         task_specific_models = self._get_task_specific_models(task_type)
         
-        # Calculate score for each model
-        model_scores = []
-        for model_conf in self.models_config:
-            # Get base score
-            score = self._calculate_model_score(model_conf, task_features)
-            
-            # Apply task-specific adjustments if available
-            if model_conf["name"] in task_specific_models:
-                task_adjustment = task_specific_models[model_conf["name"]]
-                score += task_adjustment * 25  # Boost models that perform well on this task type
-            
-            # Apply resource constraints
-            score = self._apply_resource_constraints(score, model_conf, task_features)
-            
-            model_scores.append((model_conf, score))
-        
-        # Sort by score (descending)
-        model_scores.sort(key=lambda x: x[1], reverse=True)
+        # Score all models at once over the per-model arrays
+        scores = self._calculate_model_scores(task_features, task_specific_models)
         
-        # Get the highest scoring model
-        selected_model_conf, score = model_scores[0]
+        # Get the highest scoring models
+        ranked_indices = self._rank_top_k(scores, k)
         
         # Record model selection for this task type
-        self._record_model_selection(task_type, selected_model_conf["name"])
-        
-        # Create LLMConfig from the selected model
-        config = LLMConfig(
-            backend=LLMBackendType(selected_model_conf["backend"]),
-            model_path=selected_model_conf["model_path"],
-            max_tokens=selected_model_conf.get("max_tokens", 2048),
-            temperature=self._adjust_temperature(selected_model_conf.get("temperature", 0.7), task_features),
-            top_p=selected_model_conf.get("top_p", 0.95),
-            top_k=selected_model_conf.get("top_k", 50),
-            quantization=selected_model_conf.get("quantization"),
-            tensor_parallel_size=selected_model_conf.get("tensor_parallel_size", 1),
-            extra_params=selected_model_conf.get("extra_params", {})
-        )
+        best_model_name = self._model_specs[ranked_indices[0]].name
+        self._record_model_selection(task_type, best_model_name)
         
-        # Add task-specific reasoning
-        reason = self._generate_selection_reason(selected_model_conf, score, task_features)
+        ranked = []
+        for index in ranked_indices:
+            spec = self._model_specs[index]
+            score = float(scores[index])
+            
+            # Create LLMConfig from the model's template with the task temperature
+            config = replace(
+                self._get_model_template(index),
+                temperature=self._adjust_temperature(spec.temperature, task_features)
+            )
+            
+            # Add task-specific reasoning
+            reason = self._generate_selection_reason(spec, score, task_features)
+            ranked.append((config, reason))
         
         # Update model usage statistics
-        self._update_model_usage(selected_model_conf["name"])
+        self._update_model_usage(best_model_name)
         
-        logger.info(f"Model router selected: {selected_model_conf['name']} (score: {score:.2f})")
-        return config, reason
+        logger.info("Model router selected: %s (score: %.2f)", best_model_name, scores[ranked_indices[0]])
+        return ranked
+    
+    @staticmethod
+    def _rank_top_k(scores: np.ndarray, k: int) -> List[int]:
+        """Get the indices of the k highest scores, best first, ties to the earlier model"""
+        if k <= 1:
+            return [int(np.argmax(scores))]
+        
+        # Partition out the top k in linear time, then order only those
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        order = np.lexsort((candidates, -scores[candidates]))
+        return [int(i) for i in candidates[order]]
     
     def _extract_task_features(self, task: Task, context: Dict[str, Any]) -> Dict[str, Any]:
         """Extract relevant features from the task for model selection"""
@@ -146,27 +352,17 @@ class ModelRouter:
         query_length = len(task.query)
         tools_count = len(task.tools_allowed) if task.tools_allowed else 0
         has_context = bool(context)
-        context_size = len(json.dumps(context)) if context else 0
+        context_size = _approx_context_size(context, _CONTEXT_SIZE_LIMIT) if context else 0
         
-        # Classify task type based on content and tools
-        task_type = self._classify_task_type(task.query, task.tools_allowed)
+        # Text heuristics depend only on the query and tools, so repeated queries hit the cache
+        tools_key = tuple(task.tools_allowed) if task.tools_allowed else ()
+        (task_type, reasoning_types, expected_response_length,
+         has_real_time_constraint) = self._extract_text_features(task.query, tools_key)
         
-        # Estimate task complexity based on features
-        if query_length > 500 or tools_count > 5 or context_size > 10000:
-            complexity = "high"
-        elif query_length > 200 or tools_count > 2 or context_size > 3000:
-            complexity = "medium"
-        else:
-            complexity = "low"
-        
-        # Determine if task requires specific reasoning
-        reasoning_types = self._detect_reasoning_types(task.query)
-        
-        # Estimate expected response length
-        expected_response_length = self._estimate_response_length(task.query)
-        
-        # Detect if real-time constraints exist
-        has_real_time_constraint = "urgent" in task.query.lower() or "immediate" in task.query.lower()
+        # Estimate task complexity based on features, from which thresholds are crossed
+        over_high = (query_length > 500) | (tools_count > 5) | (context_size > 10000)
+        over_medium = (query_length > 200) | (tools_count > 2) | (context_size > 3000)
+        complexity = _COMPLEXITY_LEVELS[over_high << 1 | over_medium]
         
         return {
             "complexity": complexity,
@@ -176,27 +372,55 @@ class ModelRouter:
             "context_size": context_size,
             "agent_type": task.agent_type,
             "task_type": task_type,
-            "reasoning_types": reasoning_types,
+            "reasoning_types": list(reasoning_types),
             "expected_response_length": expected_response_length,
             "has_real_time_constraint": has_real_time_constraint
         }
     
-    def _classify_task_type(self, query: str, tools_allowed: Optional[List[str]]) -> str:
-        """Classify the task type based on the query and tools"""
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _extract_text_features(query: str, tools_key: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...], str, bool]:
+        """Derive the query text heuristics, cached across routers by query and tools"""
+        # Lowercase once; every heuristic below works on the same string
         query_lower = query.lower()
         
+        # Find every heuristic keyword in one pass over the query
+        keywords = ModelRouter._scan_keywords(query_lower)
+        
+        # Classify task type based on content and tools
+        task_type = ModelRouter._classify_task_type(keywords, tools_key)
+        
+        # Determine if task requires specific reasoning
+        reasoning_types = tuple(ModelRouter._detect_reasoning_types(keywords))
+        
+        # Estimate expected response length
+        expected_response_length = ModelRouter._estimate_response_length(keywords, len(query_lower.split()))
+        
+        # Detect if real-time constraints exist
+        has_real_time_constraint = "urgent" in keywords or "immediate" in keywords
+        
+        return task_type, reasoning_types, expected_response_length, has_real_time_constraint
+    
+    @staticmethod
+    def _scan_keywords(query_lower: str) -> Set[str]:
+        """Find which task heuristic keywords occur in an already lowercased query"""
+        return {match.group(1) for match in _TASK_KEYWORD_PATTERN.finditer(query_lower)}
+    
+    @staticmethod
+    def _classify_task_type(keywords: Set[str], tools_allowed: Optional[List[str]]) -> str:
+        """Classify the task type based on the query keywords and tools"""
         # Check for common task types based on keywords
-        if "summarize" in query_lower or "summary" in query_lower:
+        if "summarize" in keywords or "summary" in keywords:
             return "summarization"
-        elif "translate" in query_lower:
+        elif "translate" in keywords:
             return "translation"
-        elif "code" in query_lower or "function" in query_lower or "programming" in query_lower:
+        elif "code" in keywords or "function" in keywords or "programming" in keywords:
             return "coding"
-        elif "search" in query_lower or "find information" in query_lower:
+        elif "search" in keywords or "find information" in keywords:
             return "information_retrieval"
-        elif "creative" in query_lower or "write a story" in query_lower or "poem" in query_lower:
+        elif "creative" in keywords or "write a story" in keywords or "poem" in keywords:
             return "creative_writing"
-        elif "analyze" in query_lower or "data" in query_lower:
+        elif "analyze" in keywords or "data" in keywords:
             return "data_analysis"
         
         # Check based on tools if available
@@ -211,23 +435,23 @@ class ModelRouter:
         # Default to general
         return "general"
     
-    def _detect_reasoning_types(self, query: str) -> List[str]:
+    @staticmethod
+    def _detect_reasoning_types(keywords: Set[str]) -> List[str]:
         """Detect the types of reasoning required for the task"""
-        query_lower = query.lower()
         reasoning_types = []
         
         # Detect common reasoning patterns
-        if "why" in query_lower or "explain" in query_lower or "reason" in query_lower:
+        if "why" in keywords or "explain" in keywords or "reason" in keywords:
             reasoning_types.append("causal")
-        if "compare" in query_lower or "difference between" in query_lower:
+        if "compare" in keywords or "difference between" in keywords:
             reasoning_types.append("comparative")
-        if "step by step" in query_lower or "how to" in query_lower:
+        if "step by step" in keywords or "how to" in keywords:
             reasoning_types.append("procedural")
-        if "predict" in query_lower or "forecast" in query_lower or "future" in query_lower:
+        if "predict" in keywords or "forecast" in keywords or "future" in keywords:
             reasoning_types.append("predictive")
-        if "ethics" in query_lower or "moral" in query_lower or "should" in query_lower:
+        if "ethics" in keywords or "moral" in keywords or "should" in keywords:
             reasoning_types.append("ethical")
-        if "creative" in query_lower or "imagine" in query_lower or "generate" in query_lower:
+        if "creative" in keywords or "imagine" in keywords or "generate" in keywords:
             reasoning_types.append("creative")
         
         # If no specific reasoning detected, assume logical reasoning
@@ -236,124 +460,197 @@ class ModelRouter:
         
         return reasoning_types
     
-    def _estimate_response_length(self, query: str) -> str:
+    @staticmethod
+    def _estimate_response_length(keywords: Set[str], word_count: int) -> str:
         """Estimate the expected response length"""
-        query_lower = query.lower()
-        word_count = len(query.split())
-        
-        if "brief" in query_lower or "short" in query_lower or word_count < 10:
+        if "brief" in keywords or "short" in keywords or word_count < 10:
             return "short"
-        elif "detailed" in query_lower or "comprehensive" in query_lower or word_count > 30:
+        elif "detailed" in keywords or "comprehensive" in keywords or word_count > 30:
             return "long"
         else:
             return "medium"
     
-    def _calculate_model_score(self, model_conf: Dict[str, Any], 
-                              task_features: Dict[str, Any]) -> float:
-        """
-        Calculate a score for how well a model fits a task.
-        Higher score means better fit.
-        """
-        score = 0.0
-        model_name = model_conf["name"]
+    def _build_model_arrays(self):
+        """Build the per-model scoring inputs as parallel arrays indexed by model"""
+        self._model_specs = [ModelSpec.from_config(model_conf) for model_conf in self.models_config]
+        self._model_index = {spec.name: i for i, spec in enumerate(self._model_specs)}
+        
+        # Capability matrix: one row per model, one column per capability flag
+        self._capability_matrix = np.array([
+            [bool(spec.capabilities.get(key, False)) for key in _CAPABILITY_KEYS]
+            for spec in self._model_specs
+        ], dtype=np.float64).reshape(len(self._model_specs), len(_CAPABILITY_KEYS))
+        
+        self._resource_efficiency = np.array(
+            [spec.resource_efficiency for spec in self._model_specs],
+            dtype=np.float64
+        )
+        self._is_quantized = np.array(
+            [bool(spec.quantization) for spec in self._model_specs],
+            dtype=bool
+        )
+        self._is_parallel_vllm = np.array(
+            [spec.backend == "vLLM" and spec.tensor_parallel_size > 1 for spec in self._model_specs],
+            dtype=bool
+        )
+        
+        # Resource efficiency and parallelism terms do not depend on the task
+        self._static_scores = self._resource_efficiency * 10 + np.where(self._is_parallel_vllm, 5, 0)
+        
+        # Conditional per-model terms, precomputed so scoring only adds whole vectors
+        self._quantization_bonus = np.where(self._is_quantized, 5.0, 0.0)
+        self._high_load_adjustments = self._resource_efficiency * 20 - np.where(self._is_parallel_vllm, 15, 0)
+        
+        # Capability scores keyed by task shape; the capability matrix never changes
+        self._capability_score_cache: Dict[Tuple[Any, ...], np.ndarray] = {}
         
-        # Base score from model capabilities
-        capabilities = model_conf.get("capabilities", {})
+        # LLMConfig templates with the static per-model fields, built on first selection
+        self._model_templates: List[Optional[LLMConfig]] = [None] * len(self.models_config)
+        
+        self._refresh_metric_arrays()
+    
+    def _get_model_template(self, index: int) -> LLMConfig:
+        """Get the LLMConfig template for a model, building it on first use"""
+        template = self._model_templates[index]
+        if template is None:
+            spec = self._model_specs[index]
+            template = LLMConfig(
+                backend=LLMBackendType(spec.backend),
+                model_path=spec.model_path,
+                max_tokens=spec.max_tokens,
+                top_p=spec.top_p,
+                top_k=spec.top_k,
+                quantization=spec.quantization,
+                tensor_parallel_size=spec.tensor_parallel_size,
+                extra_params=spec.extra_params
+            )
+            self._model_templates[index] = template
+        return template
+    
+    def _refresh_metric_arrays(self):
+        """Rebuild the per-model historical metric arrays from model_metrics"""
+        num_models = len(self._model_specs)
+        self._has_metrics = np.zeros(num_models, dtype=bool)
+        
+        # One row per model, one column per moving-average metric
+        self._metric_values = np.tile(np.array(_EMA_METRIC_DEFAULTS, dtype=np.float64), (num_models, 1))
+        
+        for model_name, i in self._model_index.items():
+            metrics = self.model_metrics.get(model_name)
+            if metrics is None:
+                continue
+            
+            self._has_metrics[i] = True
+            self._metric_values[i] = [
+                metrics.get(key, default) for key, default in zip(_EMA_METRIC_KEYS, _EMA_METRIC_DEFAULTS)
+            ]
+        
+        self._refresh_metric_scores()
+    
+    def _refresh_metric_scores(self):
+        """Recompute the metric-derived score terms from the metric arrays"""
+        has_metrics = self._has_metrics
+        success_rate, avg_latency, accuracy, token_efficiency = self._metric_values.T
+        
+        # Historical performance score: success rate, latency normalized to 0-1,
+        # accuracy and token efficiency, only for models with metrics
+        latency_factor = np.maximum(0, 1 - (avg_latency / 5000))
+        self._metric_scores = np.where(
+            has_metrics,
+            success_rate * 20 + latency_factor * 15 + accuracy * 25 + token_efficiency * 10,
+            0.0
+        )
+        
+        # Real-time adjustment: penalize models slower than 3s, favor those under 500ms, then 1s
+        self._real_time_adjustments = np.where(
+            has_metrics,
+            np.select([avg_latency > 3000, avg_latency < 500, avg_latency < 1000], [-30.0, 25.0, 15.0], 0.0),
+            0.0
+        )
+    
+    def _score_capabilities(self, complexity: str, agent_type: str,
+                            reasoning_types: Tuple[str, ...], expected_length: str) -> np.ndarray:
+        """Score how well each model's capabilities match a task shape"""
+        # Weight each capability column by how much it matters for this task
+        weights = np.zeros(len(_CAPABILITY_KEYS))
+        base_score = 0.0
         
         # Match complexity to model capability
-        if task_features["complexity"] == "high" and capabilities.get("handles_complex_tasks", False):
-            score += 30
-        elif task_features["complexity"] == "medium" and capabilities.get("handles_medium_tasks", False):
-            score += 20
-        elif task_features["complexity"] == "low":
-            score += 10
+        if complexity == "high":
+            weights[_CAPABILITY_INDEX["handles_complex_tasks"]] += 30
+        elif complexity == "medium":
+            weights[_CAPABILITY_INDEX["handles_medium_tasks"]] += 20
+        elif complexity == "low":
+            base_score += 10
         
         # Consider special capabilities for specific agent types
-        if task_features["agent_type"] == "multi_agent" and capabilities.get("multi_agent_coordination", False):
-            score += 15
+        if agent_type == "multi_agent":
+            weights[_CAPABILITY_INDEX["multi_agent_coordination"]] += 15
         
-        if task_features["agent_type"] == "human_in_loop" and capabilities.get("human_interaction", False):
-            score += 15
+        if agent_type == "human_in_loop":
+            weights[_CAPABILITY_INDEX["human_interaction"]] += 15
         
         # Consider reasoning capabilities
-        for reasoning_type in task_features.get("reasoning_types", []):
-            if capabilities.get(f"{reasoning_type}_reasoning", False):
-                score += 10
+        for reasoning_type in reasoning_types:
+            column = _CAPABILITY_INDEX.get(f"{reasoning_type}_reasoning")
+            if column is not None:
+                weights[column] += 10
         
         # Consider response length
-        expected_length = task_features.get("expected_response_length", "medium")
-        if expected_length == "long" and capabilities.get("handles_long_generation", False):
-            score += 15
-        elif expected_length == "short" and capabilities.get("efficient_short_responses", False):
-            score += 10
-        
-        # Consider historical performance if available
-        if model_name in self.model_metrics:
-            metrics = self.model_metrics[model_name]
-            
-            # Success rate impact (higher is better)
-            success_rate = metrics.get("success_rate", 0.5)
-            score += success_rate * 20
-            
-            # Latency impact (lower is better)
-            avg_latency = metrics.get("avg_latency", 1000)
-            latency_factor = max(0, 1 - (avg_latency / 5000))  # Normalize to 0-1 range
-            score += latency_factor * 15
-            
-            # Accuracy impact (higher is better)
-            accuracy = metrics.get("accuracy", 0.5)
-            score += accuracy * 25
-            
-            # Consider token efficiency (higher is better)
-            token_efficiency = metrics.get("token_efficiency", 0.5)
-            score += token_efficiency * 10
-            
-            # Real-time constraint considerations
-            if task_features.get("has_real_time_constraint", False):
-                # Heavily penalize slow models for real-time tasks
-                if avg_latency > 3000:  # More than 3 seconds
-                    score -= 30
-            
-        # Consider resource constraints
-        resource_efficiency = model_conf.get("resource_efficiency", 0.5)  # 0-1 scale
-        score += resource_efficiency * 10
+        if expected_length == "long":
+            weights[_CAPABILITY_INDEX["handles_long_generation"]] += 15
+        elif expected_length == "short":
+            weights[_CAPABILITY_INDEX["efficient_short_responses"]] += 10
+        
+        scores = self._capability_matrix @ weights + base_score
+        scores.flags.writeable = False
+        return scores
+    
+    def _calculate_model_scores(self, task_features: Dict[str, Any],
+                                task_specific_models: Dict[str, float]) -> np.ndarray:
+        """
+        Calculate a score for how well each model fits a task, including
+        task history adjustments and resource constraints.
+        Higher score means better fit.
+        """
+        complexity = task_features["complexity"]
+        
+        # Capability fit depends only on the task's shape, so it is computed once per shape
+        shape_key = (
+            complexity,
+            task_features["agent_type"],
+            tuple(task_features.get("reasoning_types", [])),
+            task_features.get("expected_response_length", "medium"),
+        )
+        capability_scores = self._capability_score_cache.get(shape_key)
+        if capability_scores is None:
+            capability_scores = self._score_capabilities(*shape_key)
+            self._capability_score_cache[shape_key] = capability_scores
         
-        # If model is quantized, it might be more efficient for certain tasks
-        if model_conf.get("quantization") and task_features["complexity"] != "high":
-            score += 5
+        scores = capability_scores + self._metric_scores
         
-        # Adjust score for hardware-specific optimizations
-        if model_conf.get("backend") == "vLLM" and model_conf.get("tensor_parallel_size", 1) > 1:
-            score += 5  # Reward parallelized models for potentially faster inference
+        # Static resource terms, precomputed per model
+        scores += self._static_scores
         
-        return score
-    
-    def _apply_resource_constraints(self, score: float, model_conf: Dict[str, Any], 
-                                  task_features: Dict[str, Any]) -> float:
-        """Apply resource constraints to the model score"""
-        # Check current system load
-        system_load = self._get_system_load()
+        # If model is quantized, it might be more efficient for certain tasks
+        if complexity != "high":
+            scores += self._quantization_bonus
         
-        # If system is under heavy load, favor lightweight models
-        if system_load > 0.8:  # 80% load
-            resource_efficiency = model_conf.get("resource_efficiency", 0.5)
-            score += resource_efficiency * 20  # Heavier weight during high load
-            
-            # Penalize heavyweight models
-            if model_conf.get("backend") == "vLLM" and model_conf.get("tensor_parallel_size", 1) > 1:
-                score -= 15
+        # Boost models that perform well on this task type
+        for model_name, task_adjustment in task_specific_models.items():
+            index = self._model_index.get(model_name)
+            if index is not None:
+                scores[index] += task_adjustment * 25
+        
+        # If system is under heavy load, favor lightweight models and penalize heavyweight ones
+        if self._get_system_load() > 0.8:  # 80% load
+            scores += self._high_load_adjustments
         
-        # If task has real-time constraints, prioritize faster models
+        # For real-time tasks, favor models with known low latency and penalize slow ones
         if task_features.get("has_real_time_constraint", False):
-            # Favor models with known lower latency
-            if model_conf["name"] in self.model_metrics:
-                avg_latency = self.model_metrics[model_conf["name"]].get("avg_latency", 1000)
-                if avg_latency < 500:  # Less than 500ms
-                    score += 25
-                elif avg_latency < 1000:  # Less than 1s
-                    score += 15
+            scores += self._real_time_adjustments
         
-        return score
+        return scores
     
     def _get_system_load(self) -> float:
         """Get current system load (simplified)"""
@@ -363,11 +660,11 @@ class ModelRouter:
     
     def _get_task_specific_models(self, task_type: str) -> Dict[str, float]:
         """Get task-specific model performance adjustments"""
-        if task_type not in self.task_history:
+        task_models = self.task_history.get(task_type)
+        if task_models is None:
             return {}
         
         # Calculate performance adjustment based on success rate for this task type
-        task_models = self.task_history[task_type]
         result = {}
         
         for model_name, stats in task_models.items():
@@ -382,16 +679,17 @@ class ModelRouter:
     
     def _record_model_selection(self, task_type: str, model_name: str):
         """Record that a model was selected for a task type"""
-        if task_type not in self.task_history:
-            self.task_history[task_type] = {}
-        
-        if model_name not in self.task_history[task_type]:
-            self.task_history[task_type][model_name] = {"total": 0, "successes": 0}
+        with self._state_lock:
+            task_models = self.task_history.setdefault(task_type, {})
+            stats = task_models.get(model_name)
+            if stats is None:
+                stats = task_models[model_name] = {"total": 0, "successes": 0}
+            
+            stats["total"] += 1
         
-        self.task_history[task_type][model_name]["total"] += 1
-        self._save_task_history()
+        self._persistence.mark_dirty("task_history")
     
-    def _generate_selection_reason(self, model_conf: Dict[str, Any], score: float, 
+    def _generate_selection_reason(self, spec: ModelSpec, score: float, 
                                 task_features: Dict[str, Any]) -> str:
         """Generate a detailed reason for the model selection"""
         complexity = task_features.get("complexity", "unknown")
@@ -400,7 +698,7 @@ class ModelRouter:
         
         # Build the reason
         reason_parts = [
-            f"Selected {model_conf['name']} based on task complexity ({complexity})",
+            f"Selected {spec.name} based on task complexity ({complexity})",
             f"task type ({task_type})"
         ]
         
@@ -409,8 +707,8 @@ class ModelRouter:
             reason_parts.append(f"required reasoning ({', '.join(reasoning_types)})")
         
         # Add historical performance if available
-        if model_conf["name"] in self.model_metrics:
-            metrics = self.model_metrics[model_conf["name"]]
+        metrics = self.model_metrics.get(spec.name)
+        if metrics is not None:
             success_rate = metrics.get("success_rate", 0)
             reason_parts.append(f"historical performance (success rate: {success_rate:.2f})")
         
@@ -440,14 +738,39 @@ class ModelRouter:
     
     def _update_model_usage(self, model_name: str):
         """Update model usage statistics"""
-        if model_name not in self.model_usage:
-            self.model_usage[model_name] = {
+        usage = self.model_usage.get(model_name)
+        if usage is None:
+            usage = self.model_usage[model_name] = {
                 "count": 0,
-                "last_used": None
+                "last_used_ns": None
             }
         
-        self.model_usage[model_name]["count"] += 1
-        self.model_usage[model_name]["last_used"] = datetime.now().isoformat()
+        usage["count"] += 1
+        usage["last_used_ns"] = time.monotonic_ns()
+    
+    def get_model_usage(self, model_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get usage statistics for a specific model or all models.
+        
+        Args:
+            model_name: Optional name of the model to get usage for
+            
+        Returns:
+            Dictionary with the selection count and ISO last-used time
+        """
+        def format_usage(usage: Dict[str, Any]) -> Dict[str, Any]:
+            last_used_ns = usage["last_used_ns"]
+            last_used = None
+            if last_used_ns is not None:
+                elapsed = timedelta(microseconds=(last_used_ns - self._clock_anchor_ns) // 1000)
+                last_used = (self._clock_anchor + elapsed).isoformat()
+            return {"count": usage["count"], "last_used": last_used}
+        
+        if model_name:
+            usage = self.model_usage.get(model_name)
+            return format_usage(usage) if usage else {}
+        else:
+            return {name: format_usage(usage) for name, usage in self.model_usage.items()}
     
     def update_model_metrics(self, model_name: str, metrics: Dict[str, Any]):
         """
@@ -457,61 +780,77 @@ class ModelRouter:
             model_name: Name of the model
             metrics: Performance metrics (success_rate, latency, accuracy, etc.)
         """
-        if model_name not in self.model_metrics:
-            self.model_metrics[model_name] = {}
-        
-        # Update metrics with new values
-        current_metrics = self.model_metrics[model_name]
-        
-        # Handle success_rate as a moving average
-        if "success_rate" in metrics:
-            new_success = metrics["success_rate"]
-            old_success = current_metrics.get("success_rate", 0.5)
-            current_metrics["success_rate"] = old_success * 0.9 + new_success * 0.1
-        
-        # Handle latency as a moving average
-        if "avg_latency" in metrics:
-            new_latency = metrics["avg_latency"]
-            old_latency = current_metrics.get("avg_latency", 1000)
-            current_metrics["avg_latency"] = old_latency * 0.9 + new_latency * 0.1
-        
-        # Handle accuracy as a moving average
-        if "accuracy" in metrics:
-            new_accuracy = metrics["accuracy"]
-            old_accuracy = current_metrics.get("accuracy", 0.5)
-            current_metrics["accuracy"] = old_accuracy * 0.9 + new_accuracy * 0.1
-        
-        # Handle token efficiency
-        if "token_efficiency" in metrics:
-            new_efficiency = metrics["token_efficiency"]
-            old_efficiency = current_metrics.get("token_efficiency", 0.5)
-            current_metrics["token_efficiency"] = old_efficiency * 0.9 + new_efficiency * 0.1
-        
-        # Update other metrics directly
-        for key, value in metrics.items():
-            if key not in ["success_rate", "avg_latency", "accuracy", "token_efficiency"]:
-                current_metrics[key] = value
-        
-        # Update task-specific success
-        if "task_type" in metrics and "success" in metrics:
-            task_type = metrics["task_type"]
-            success = metrics["success"]
-            
-            if task_type not in self.task_history:
-                self.task_history[task_type] = {}
+        self.update_model_metrics_batch({model_name: metrics})
+    
+    def update_model_metrics_batch(self, updates: Dict[str, Dict[str, Any]]):
+        """
+        Update performance metrics for several models at once.
+        
+        Args:
+            updates: Performance metrics keyed by model name
+        """
+        with self._state_lock:
+            # Blend the moving-average metrics of all configured models in one step
+            new_values = np.zeros_like(self._metric_values)
+            provided = np.zeros(self._metric_values.shape, dtype=bool)
+            for model_name, metrics in updates.items():
+                index = self._model_index.get(model_name)
+                if index is None:
+                    continue
+                
+                for column, key in enumerate(_EMA_METRIC_KEYS):
+                    if key in metrics:
+                        new_values[index, column] = metrics[key]
+                        provided[index, column] = True
             
-            if model_name not in self.task_history[task_type]:
-                self.task_history[task_type][model_name] = {"total": 0, "successes": 0}
+            self._metric_values = np.where(
+                provided, self._metric_values * 0.9 + new_values * 0.1, self._metric_values
+            )
             
-            self.task_history[task_type][model_name]["total"] += 1
-            if success:
-                self.task_history[task_type][model_name]["successes"] += 1
+            for model_name, metrics in updates.items():
+                current_metrics = self.model_metrics.setdefault(model_name, {})
+                index = self._model_index.get(model_name)
+                
+                # Mirror the moving averages into the persisted metrics
+                for column, key in enumerate(_EMA_METRIC_KEYS):
+                    if key not in metrics:
+                        continue
+                    
+                    if index is not None:
+                        current_metrics[key] = float(self._metric_values[index, column])
+                    else:
+                        old_value = current_metrics.get(key, _EMA_METRIC_DEFAULTS[column])
+                        current_metrics[key] = old_value * 0.9 + metrics[key] * 0.1
+                
+                if index is not None:
+                    self._has_metrics[index] = True
+                
+                # Update other metrics directly
+                for key, value in metrics.items():
+                    if key not in _EMA_METRIC_KEYS:
+                        current_metrics[key] = value
+                
+                # Update task-specific success
+                if "task_type" in metrics and "success" in metrics:
+                    task_type = metrics["task_type"]
+                    success = metrics["success"]
+                    
+                    task_models = self.task_history.setdefault(task_type, {})
+                    stats = task_models.get(model_name)
+                    if stats is None:
+                        stats = task_models[model_name] = {"total": 0, "successes": 0}
+                    
+                    stats["total"] += 1
+                    if success:
+                        stats["successes"] += 1
             
-            self._save_task_history()
+            self._refresh_metric_scores()
         
-        # Save updated metrics
-        self._save_model_metrics()
-        logger.info(f"Updated metrics for model: {model_name}")
+        # Persist in the background; repeated updates coalesce into one write
+        self._persistence.mark_dirty("model_metrics")
+        self._persistence.mark_dirty("task_history")
+        for model_name in updates:
+            logger.info("Updated metrics for model: %s", model_name)
     
     def get_model_metrics(self, model_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -546,10 +885,9 @@ class ModelRouter:
     def evaluate_models(self):
         """Periodically evaluate models and update configurations"""
         # Check if it's time to evaluate (e.g., once per day)
-        now = datetime.now()
-        time_since_last = (now - self.last_evaluation).total_seconds()
+        now_ns = time.monotonic_ns()
         
-        if time_since_last < 86400:  # Less than 24 hours
+        if now_ns - self._last_evaluation_ns < 86400 * 10**9:  # Less than 24 hours
             return
         
         logger.info("Conducting periodic model evaluation")
@@ -562,14 +900,19 @@ class ModelRouter:
         
         # Update configurations for underperforming models
         for model_name in underperforming:
-            for i, model_conf in enumerate(self.models_config):
-                if model_conf["name"] == model_name:
-                    # Adjust parameters to improve performance
-                    if "temperature" in model_conf:
-                        model_conf["temperature"] = 0.5  # Reset to middle value
-                    
-                    # Log the change
-                    logger.info(f"Updated configuration for underperforming model: {model_name}")
+            index = self._model_index.get(model_name)
+            if index is None:
+                continue
+            
+            model_conf = self.models_config[index]
+            
+            # Adjust parameters to improve performance
+            if "temperature" in model_conf:
+                model_conf["temperature"] = 0.5  # Reset to middle value
+                self._model_specs[index] = replace(self._model_specs[index], temperature=0.5)
+            
+            # Log the change
+            logger.info("Updated configuration for underperforming model: %s", model_name)
         
         # Reset evaluation timer
-        self.last_evaluation = now 
\ No newline at end of file
+        self._last_evaluation_ns = now_ns 
\ No newline at end of file
@@ -3,20 +3,115 @@ Performance dashboard for the AgentForge OSS framework.
 This module provides visualization and analysis of model performance metrics.
 """
 
+import hashlib
 import logging
 import json
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
 
 logger = logging.getLogger(__name__)
 
+# pandas and matplotlib are imported where they are used, so importing this module stays cheap
+
+def _model_metrics_frame(model_metrics: Dict[str, Any]) -> 'pd.DataFrame':
+    """Tabulate model metrics with one row per model, treating missing values as 0"""
+    import pandas as pd
+    
+    frame = pd.DataFrame.from_dict(model_metrics, orient="index")
+    return frame.reindex(columns=["success_rate", "avg_latency"]).fillna(0)
+
+def _task_metrics_frame(task_metrics: Dict[str, Any]) -> 'pd.DataFrame':
+    """Tabulate task metrics with one row per (task type, model) and its success rate"""
+    import pandas as pd
+    
+    rows = [
+        (task_type, model_name, stats.get("total", 0), stats.get("successes", 0))
+        for task_type, models in task_metrics.items()
+        for model_name, stats in models.items()
+    ]
+    frame = pd.DataFrame(rows, columns=["task_type", "model", "total", "successes"])
+    frame["rate"] = frame["successes"].divide(frame["total"].where(frame["total"] > 0)).fillna(0)
+    return frame
+
+def _task_rate_matrix(task_metrics: Dict[str, Any], task_df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Pivot success rates into one row per model and one column per task type, NaN where a model has no attempts"""
+    attempted_rates = task_df["rate"].where(task_df["total"] > 0)
+    rates = task_df.assign(rate=attempted_rates).pivot(index="model", columns="task_type", values="rate")
+    return rates.reindex(index=sorted(task_df["model"].unique()), columns=sorted(task_metrics))
+
+def _draw_bars(draw: ImageDraw.ImageDraw, box: tuple, labels: List[str], values: List[float],
+               title: str, color: str, horizontal: bool = False,
+               max_value: Optional[float] = None, value_format: Optional[str] = None):
+    """
+    Draw a titled bar chart into a region of an image.
+    
+    Args:
+        draw: Drawing context of the target image
+        box: Region to draw into as (left, top, right, bottom)
+        labels: Bar labels
+        values: Bar values
+        title: Chart title
+        color: Bar fill color
+        horizontal: Draw bars left to right instead of bottom to top
+        max_value: Value at the end of the axis, defaults to the largest value
+        value_format: Format for a value label at the end of each bar, none if omitted
+    """
+    font = ImageFont.load_default()
+    left, top, right, bottom = box
+    
+    # Title centered above the plot area
+    title_width = draw.textlength(title, font=font)
+    draw.text(((left + right - title_width) / 2, top + 5), title, fill="black", font=font)
+    
+    # Leave room for the labels along the category axis
+    if horizontal:
+        label_width = max((draw.textlength(str(label), font=font) for label in labels), default=0)
+        plot_left, plot_top, plot_right, plot_bottom = left + label_width + 15, top + 30, right - 80, bottom - 20
+    else:
+        plot_left, plot_top, plot_right, plot_bottom = left + 40, top + 30, right - 10, bottom - 30
+    draw.line([(plot_left, plot_top), (plot_left, plot_bottom), (plot_right, plot_bottom)], fill="black")
+    
+    if not values:
+        return
+    
+    max_v = max_value or max(values) or 1
+    slot = ((plot_bottom - plot_top) if horizontal else (plot_right - plot_left)) / len(values)
+    bar_width = slot * 0.8
+    
+    for i, (label, value) in enumerate(zip(labels, values)):
+        offset = i * slot + (slot - bar_width) / 2
+        extent = min(max(value / max_v, 0), 1)
+        label = str(label)
+        value_text = value_format.format(value) if value_format else None
+        
+        if horizontal:
+            y0 = plot_top + offset
+            x1 = plot_left + extent * (plot_right - plot_left)
+            draw.rectangle([plot_left, y0, x1, y0 + bar_width], fill=color)
+            draw.text((left + 5, y0 + bar_width / 2 - 5), label, fill="black", font=font)
+            if value_text:
+                draw.text((x1 + 5, y0 + bar_width / 2 - 5), value_text, fill="black", font=font)
+        else:
+            x0 = plot_left + offset
+            y1 = plot_bottom - extent * (plot_bottom - plot_top)
+            draw.rectangle([x0, y1, x0 + bar_width, plot_bottom], fill=color)
+            label_x = x0 + (bar_width - draw.textlength(label, font=font)) / 2
+            draw.text((label_x, plot_bottom + 5), label, fill="black", font=font)
+            if value_text:
+                value_x = x0 + (bar_width - draw.textlength(value_text, font=font)) / 2
+                draw.text((value_x, y1 - 15), value_text, fill="black", font=font)
+
 class PerformanceDashboard:
     """Dashboard for visualizing and analyzing model performance"""
     
+    # Number of rendered chart sets kept in the cache, most recently used first
+    CACHE_SIZE = 8
+    
     def __init__(self, output_dir: str = "./performance_reports"):
         """
         Initialize the performance dashboard.
@@ -25,7 +120,11 @@ class PerformanceDashboard:
             output_dir: Directory to save generated reports
         """
         self.output_dir = output_dir
+        self._cache_dir = os.path.join(output_dir, ".cache")
         self._ensure_output_dir()
+        
+        # Single figure reused for every matplotlib chart, created on first use
+        self._figure = None
     
     def _ensure_output_dir(self):
         """Ensure the output directory exists"""
@@ -35,6 +134,19 @@ class PerformanceDashboard:
         except Exception as e:
             logger.error(f"Failed to create output directory: {e}")
     
+    def _reset_figure(self, width: float, height: float) -> 'Figure':
+        """Clear the shared figure and resize it for the next chart"""
+        if self._figure is None:
+            # A bare Figure renders straight to image files, without pyplot or a GUI backend
+            from matplotlib.figure import Figure
+            
+            self._figure = Figure()
+            self._figure.set_layout_engine("tight")
+        
+        self._figure.clear()
+        self._figure.set_size_inches(width, height)
+        return self._figure
+    
     def generate_report(self, model_router, time_period: str = "day") -> str:
         """
         Generate a performance report.
@@ -51,18 +163,40 @@ class PerformanceDashboard:
             model_metrics = model_router.get_model_metrics()
             task_metrics = model_router.get_task_metrics()
             
+            # Tabulate metrics once for all charts and the summary
+            model_df = _model_metrics_frame(model_metrics)
+            task_rates = _task_rate_matrix(task_metrics, _task_metrics_frame(task_metrics))
+            
             # Create a timestamp for the report
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_path = os.path.join(self.output_dir, f"performance_report_{timestamp}")
-            os.makedirs(report_path, exist_ok=True)
             
-            # Generate visualizations
-            self._generate_model_comparison(model_metrics, report_path)
-            self._generate_task_performance(task_metrics, report_path)
-            self._generate_latency_analysis(model_metrics, report_path)
+            # Charts only depend on the metrics, so unchanged metrics reuse earlier renders
+            cache_key = self._metrics_cache_key(model_metrics, task_metrics)
+            cache_path = os.path.join(self._cache_dir, cache_key)
+            
+            if os.path.isdir(cache_path):
+                shutil.copytree(cache_path, report_path, dirs_exist_ok=True)
+                # Mark the entry as recently used so pruning keeps it
+                os.utime(cache_path)
+                logger.debug("Reused cached visualizations: %s", cache_path)
+            else:
+                os.makedirs(report_path, exist_ok=True)
+                
+                # Generate visualizations; the charts are independent, so render them side by side
+                with ThreadPoolExecutor(max_workers=3, thread_name_prefix="dashboard") as executor:
+                    renders = [
+                        executor.submit(self._generate_model_comparison, model_df, report_path),
+                        executor.submit(self._generate_task_performance, task_rates, report_path),
+                        executor.submit(self._generate_latency_analysis, model_df, report_path)
+                    ]
+                    for render in renders:
+                        render.result()
+                
+                self._cache_visualizations(report_path, cache_path)
             
             # Generate summary report
-            summary_path = self._generate_summary(model_metrics, task_metrics, report_path)
+            summary_path = self._generate_summary(model_metrics, model_df, task_metrics, task_rates, report_path)
             
             logger.info(f"Generated performance report at: {report_path}")
             return summary_path
@@ -71,77 +205,81 @@ class PerformanceDashboard:
             logger.error(f"Error generating performance report: {e}")
             return None
     
-    def _generate_model_comparison(self, model_metrics: Dict[str, Any], report_path: str):
+    def _metrics_cache_key(self, model_metrics: Dict[str, Any], task_metrics: Dict[str, Any]) -> str:
+        """Hash the metrics a report is rendered from"""
+        payload = json.dumps([model_metrics, task_metrics], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+    
+    def _cache_visualizations(self, report_path: str, cache_path: str):
+        """Store freshly rendered charts so identical metrics can reuse them"""
+        staging_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            shutil.copytree(report_path, staging_path)
+            # Rename into place so concurrent reports never see a partial cache entry
+            os.rename(staging_path, cache_path)
+            os.utime(cache_path)
+        except Exception as e:
+            logger.debug("Could not cache visualizations: %s", e)
+            shutil.rmtree(staging_path, ignore_errors=True)
+        
+        self._prune_cache()
+    
+    def _prune_cache(self):
+        """Delete all but the most recently used cache entries"""
+        try:
+            entries = [
+                entry for entry in os.scandir(self._cache_dir)
+                if entry.is_dir() and not entry.name.endswith(".tmp")
+            ]
+        except OSError as e:
+            logger.debug("Could not list cached visualizations: %s", e)
+            return
+        
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in entries[self.CACHE_SIZE:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    
+    def _generate_model_comparison(self, model_df: 'pd.DataFrame', report_path: str):
         """Generate model comparison visualization"""
         try:
             # Extract key metrics for comparison
-            models = []
-            success_rates = []
-            latencies = []
+            models = model_df.index.tolist()
+            success_rates = model_df["success_rate"].tolist()
+            latencies = model_df["avg_latency"].tolist()
             
-            for model_name, metrics in model_metrics.items():
-                models.append(model_name)
-                success_rates.append(metrics.get("success_rate", 0))
-                latencies.append(metrics.get("avg_latency", 0))
-            
-            # Create figure with two subplots
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+            # A handful of bars is drawn directly, without matplotlib's layout machinery
+            image = Image.new("RGB", (1200, 600), "white")
+            draw = ImageDraw.Draw(image)
             
             # Success rate bar chart
-            ax1.bar(models, success_rates, color='green')
-            ax1.set_title('Model Success Rates')
-            ax1.set_xlabel('Model')
-            ax1.set_ylabel('Success Rate')
-            ax1.set_ylim(0, 1)
-            plt.setp(ax1.get_xticklabels(), rotation=45, ha='right')
+            _draw_bars(draw, (0, 0, 600, 600), models, success_rates, 'Model Success Rates', 'green',
+                       max_value=1, value_format="{:.2f}")
             
             # Latency bar chart
-            ax2.bar(models, latencies, color='blue')
-            ax2.set_title('Model Average Latencies (ms)')
-            ax2.set_xlabel('Model')
-            ax2.set_ylabel('Latency (ms)')
-            plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
-            
-            plt.tight_layout()
+            _draw_bars(draw, (600, 0, 1200, 600), models, latencies, 'Model Average Latencies (ms)', 'blue',
+                       value_format="{:.0f}")
             
-            # Save the figure
+            # Save the image
             comparison_path = os.path.join(report_path, "model_comparison.png")
-            plt.savefig(comparison_path)
-            plt.close()
+            image.save(comparison_path, optimize=False, compress_level=1)
             
             logger.debug(f"Generated model comparison visualization: {comparison_path}")
             
         except Exception as e:
             logger.error(f"Error generating model comparison: {e}")
     
-    def _generate_task_performance(self, task_metrics: Dict[str, Any], report_path: str):
+    def _generate_task_performance(self, task_rates: 'pd.DataFrame', report_path: str):
         """Generate task performance visualization"""
         try:
-            # Prepare data for visualization
-            task_types = []
-            model_names = set()
-            success_data = {}
-            
-            # Collect all task types and models
-            for task_type, models in task_metrics.items():
-                task_types.append(task_type)
-                for model_name, stats in models.items():
-                    model_names.add(model_name)
-                    if model_name not in success_data:
-                        success_data[model_name] = {}
-                    
-                    # Calculate success rate
-                    total = stats.get("total", 0)
-                    successes = stats.get("successes", 0)
-                    success_rate = successes / total if total > 0 else 0
-                    success_data[model_name][task_type] = success_rate
+            # Unattempted tasks are plotted as a zero success rate
+            rates = task_rates.fillna(0)
             
-            # Sort task types for consistency
-            task_types.sort()
-            model_names = sorted(model_names)
+            task_types = rates.columns.tolist()
+            model_names = rates.index.tolist()
             
             # Create a figure
-            fig, ax = plt.subplots(figsize=(12, 8))
+            fig = self._reset_figure(12, 8)
+            ax = fig.subplots()
             
             # Set the width of bars
             bar_width = 0.8 / len(model_names)
@@ -150,10 +288,9 @@ class PerformanceDashboard:
             indices = np.arange(len(task_types))
             
             # Plot bars for each model
-            for i, model_name in enumerate(model_names):
-                model_success_rates = [success_data[model_name].get(task, 0) for task in task_types]
+            for i, model_success_rates in enumerate(rates.values):
                 position = indices + i * bar_width
-                ax.bar(position, model_success_rates, bar_width, label=model_name)
+                ax.bar(position, model_success_rates, bar_width, label=model_names[i])
             
             # Add labels and legend
             ax.set_title('Model Success Rates by Task Type')
@@ -164,56 +301,40 @@ class PerformanceDashboard:
             ax.set_ylim(0, 1)
             ax.legend()
             
-            plt.tight_layout()
-            
-            # Save the figure
+            # Save the figure at screen resolution with fast PNG compression
             task_path = os.path.join(report_path, "task_performance.png")
-            plt.savefig(task_path)
-            plt.close()
+            fig.savefig(task_path, dpi=80, metadata={"Software": None},
+                        pil_kwargs={"compress_level": 1, "optimize": False})
             
             logger.debug(f"Generated task performance visualization: {task_path}")
             
         except Exception as e:
             logger.error(f"Error generating task performance visualization: {e}")
     
-    def _generate_latency_analysis(self, model_metrics: Dict[str, Any], report_path: str):
+    def _generate_latency_analysis(self, model_df: 'pd.DataFrame', report_path: str):
         """Generate latency analysis visualization"""
         try:
             # Extract latency data
-            models = []
-            latencies = []
+            models = model_df.index.tolist()
+            latencies = model_df["avg_latency"].tolist()
             
-            for model_name, metrics in model_metrics.items():
-                models.append(model_name)
-                latencies.append(metrics.get("avg_latency", 0))
+            # Create horizontal bar chart with latency values as text
+            image = Image.new("RGB", (1000, 600), "white")
+            draw = ImageDraw.Draw(image)
+            _draw_bars(draw, (0, 0, 1000, 600), models, latencies, 'Model Latency Comparison', 'purple',
+                       horizontal=True, value_format="{:.1f} ms")
             
-            # Create figure
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Create horizontal bar chart
-            ax.barh(models, latencies, color='purple')
-            ax.set_title('Model Latency Comparison')
-            ax.set_xlabel('Average Latency (ms)')
-            ax.set_ylabel('Model')
-            
-            # Add latency values as text
-            for i, v in enumerate(latencies):
-                ax.text(v + 10, i, f"{v:.1f} ms", va='center')
-            
-            plt.tight_layout()
-            
-            # Save the figure
+            # Save the image
             latency_path = os.path.join(report_path, "latency_analysis.png")
-            plt.savefig(latency_path)
-            plt.close()
+            image.save(latency_path, optimize=False, compress_level=1)
             
             logger.debug(f"Generated latency analysis visualization: {latency_path}")
             
         except Exception as e:
             logger.error(f"Error generating latency analysis: {e}")
     
-    def _generate_summary(self, model_metrics: Dict[str, Any], 
-                         task_metrics: Dict[str, Any], report_path: str) -> str:
+    def _generate_summary(self, model_metrics: Dict[str, Any], model_df: 'pd.DataFrame',
+                         task_metrics: Dict[str, Any], task_rates: 'pd.DataFrame', report_path: str) -> str:
         """
         Generate a summary report.
         
@@ -231,37 +352,35 @@ class PerformanceDashboard:
             best_model = None
             best_success_rate = -1
             
-            for model_name, metrics in model_metrics.items():
-                success_rate = metrics.get("success_rate", 0)
-                if success_rate > best_success_rate:
-                    best_success_rate = success_rate
-                    best_model = model_name
+            if not model_df.empty:
+                best_model = model_df["success_rate"].idxmax()
+                best_success_rate = model_df.at[best_model, "success_rate"]
             
-            # Find best model for each task type
+            # Find best model for each task type among models that have attempted it
             best_models_by_task = {}
-            
-            for task_type, models in task_metrics.items():
-                task_best_model = None
-                task_best_rate = -1
-                
-                for model_name, stats in models.items():
-                    total = stats.get("total", 0)
-                    successes = stats.get("successes", 0)
-                    
-                    if total > 0:
-                        success_rate = successes / total
-                        if success_rate > task_best_rate:
-                            task_best_rate = success_rate
-                            task_best_model = model_name
+            strong_task_types = []
+            
+            if not task_rates.empty:
+                task_types = list(task_metrics)
+                rates = task_rates.reindex(columns=task_types).to_numpy()
+                rates = np.where(np.isnan(rates), -np.inf, rates)
+                best_indices = rates.argmax(axis=0)
+                max_rates = rates.max(axis=0)
                 
-                if task_best_model:
-                    best_models_by_task[task_type] = {
-                        "model": task_best_model,
-                        "success_rate": task_best_rate
+                best_models_by_task = {
+                    task_type: {
+                        "model": task_rates.index[best_index],
+                        "success_rate": float(max_rate)
                     }
+                    for task_type, best_index, max_rate in zip(task_types, best_indices, max_rates)
+                    if max_rate > -np.inf
+                }
+                
+                # Task types whose best model is strong enough to recommend
+                strong_task_types = [task_types[i] for i in np.flatnonzero(max_rates > 0.8)]
             
-            # Generate HTML report
-            html_content = f"""<!DOCTYPE html>
+            # Generate HTML report as a list of parts, written out in one go
+            html_parts = [f"""<!DOCTYPE html>
             <html>
             <head>
                 <title>AgentForge Performance Report</title>
@@ -293,19 +412,21 @@ class PerformanceDashboard:
                             <th>Best Model</th>
                             <th>Success Rate</th>
                         </tr>
-            """
+            """]
             
             # Add rows for task-specific best models
-            for task_type, data in best_models_by_task.items():
-                html_content += f"""
+            html_parts.extend(
+                f"""
                         <tr>
                             <td>{task_type}</td>
                             <td>{data["model"]}</td>
                             <td>{data["success_rate"]:.2f}</td>
                         </tr>
                 """
+                for task_type, data in best_models_by_task.items()
+            )
             
-            html_content += """
+            html_parts.append("""
                     </table>
                 </div>
                 
@@ -334,7 +455,7 @@ class PerformanceDashboard:
                             <th>Token Efficiency</th>
                             <th>Last Used</th>
                         </tr>
-            """
+            """)
             
             # Add rows for each model
             for model_name, metrics in model_metrics.items():
@@ -347,7 +468,7 @@ class PerformanceDashboard:
                 if isinstance(last_used, (int, float)):
                     last_used = datetime.fromtimestamp(last_used).strftime("%Y-%m-%d %H:%M:%S")
                 
-                html_content += f"""
+                html_parts.append(f"""
                         <tr>
                             <td>{model_name}</td>
                             <td class="{'metric-good' if success_rate > 0.7 else 'metric-bad'}">{success_rate:.2f}</td>
@@ -355,29 +476,31 @@ class PerformanceDashboard:
                             <td>{token_efficiency if isinstance(token_efficiency, str) else f"{token_efficiency:.2f}"}</td>
                             <td>{last_used}</td>
                         </tr>
-                """
+                """)
             
-            html_content += """
+            html_parts.append("""
                     </table>
                 </div>
                 
                 <div class="section">
                     <h2>Recommendations</h2>
                     <ul>
-            """
+            """)
             
             # Generate recommendations based on metrics
             recommendations = []
             
             # Check for consistently low-performing models
-            for model_name, metrics in model_metrics.items():
-                if metrics.get("success_rate", 0) < 0.3 and metrics.get("avg_latency", 0) > 2000:
-                    recommendations.append(f"Consider removing or replacing model '{model_name}' due to poor performance.")
+            poor_models = model_df.index[(model_df["success_rate"] < 0.3) & (model_df["avg_latency"] > 2000)]
+            recommendations.extend(
+                f"Consider removing or replacing model '{model_name}' due to poor performance."
+                for model_name in poor_models
+            )
             
             # Suggest task-specific model assignments
-            for task_type, data in best_models_by_task.items():
-                if data["success_rate"] > 0.8:
-                    recommendations.append(f"Prioritize model '{data['model']}' for '{task_type}' tasks (success rate: {data['success_rate']:.2f}).")
+            for task_type in strong_task_types:
+                data = best_models_by_task[task_type]
+                recommendations.append(f"Prioritize model '{data['model']}' for '{task_type}' tasks (success rate: {data['success_rate']:.2f}).")
             
             # Add general recommendations if no specific ones
             if not recommendations:
@@ -385,19 +508,18 @@ class PerformanceDashboard:
                 recommendations.append("Consider adding more diverse models to handle specialized tasks.")
             
             # Add recommendations to HTML
-            for recommendation in recommendations:
-                html_content += f"<li>{recommendation}</li>\n"
+            html_parts.extend(f"<li>{recommendation}</li>\n" for recommendation in recommendations)
             
-            html_content += """
+            html_parts.append("""
                     </ul>
                 </div>
             </body>
             </html>
-            """
+            """)
             
             # Write HTML to file
-            with open(summary_path, "w") as f:
-                f.write(html_content)
+            with open(summary_path, "w", encoding="utf-8") as f:
+                f.writelines(html_parts)
             
             logger.info(f"Generated summary report: {summary_path}")
             return summary_path
@@ -6,9 +6,13 @@ for the vLLM backend, enabling high-performance inference with
 optimized attention mechanisms and quantization support.
 """
 
-import json
 import asyncio
-from typing import Dict, List, Optional, Any, Union
+import functools
+import logging
+import re
+import threading
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Any, Union, Tuple
+from uuid import uuid4
 
 # Import the Model Context Protocol
 from ..model_context_protocol import (
@@ -17,6 +21,7 @@ from ..model_context_protocol import (
     ModelCapability,
     FunctionDefinition
 )
+from ...utils.json_utils import loads_json
 
 # Assuming vLLM is installed and available
 try:
@@ -35,10 +40,171 @@ except ImportError:
     class AsyncEngineArgs:
         pass
 
+# Guided decoding constrains sampling to a JSON schema in recent vLLM releases
+try:
+    from vllm.sampling_params import GuidedDecodingParams
+    GUIDED_DECODING_AVAILABLE = True
+except ImportError:
+    GUIDED_DECODING_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Engines shared by all adapters with the same engine configuration; a second engine
+# for the same model would load its weights and KV cache pool onto the GPU again
+_ENGINE_CACHE: Dict[Tuple, AsyncLLMEngine] = {}
+_ENGINE_CACHE_LOCK = threading.Lock()
+
+# Model name patterns of families that support function calling and code generation
+_FUNCTION_CALLING_MODEL_PATTERN = re.compile(r"mistral|claude|gpt|llama-?3|qwen", re.IGNORECASE)
+_CODE_MODEL_PATTERN = re.compile(r"code|starcoder|codellama|deepseek-?coder", re.IGNORECASE)
+
+# JSON object in the first ```json fenced block of a response
+_FUNCTION_CALL_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Reply format asked for in function calling prompts; guided decoding only admits
+# bare JSON, so a fenced block is asked for only when replies are unconstrained
+if GUIDED_DECODING_AVAILABLE:
+    _FUNCTION_CALL_INSTRUCTIONS = (
+        "To call a function, respond with a JSON object of the form "
+        "{\"function\": \"function_name\", \"parameters\": {\"param1\": \"value1\"}}. "
+        "Otherwise respond with {\"content\": \"your answer\"}."
+    )
+else:
+    _FUNCTION_CALL_INSTRUCTIONS = (
+        "To call a function, respond in the following format:\n"
+        "```json\n{\"function\": \"function_name\", \"parameters\": {\"param1\": \"value1\", \"param2\": \"value2\"}}\n```"
+    )
+
+# 8-bit weight and activation (W8A8) schemes, mapped to the vLLM quantization method
+# that runs them and the minimum CUDA compute capability of their tensor-core kernels.
+# INT8 W8A8 checkpoints (e.g. from llm-compressor) load through compressed-tensors.
+_W8A8_QUANTIZATION = {
+    "int8": ("compressed-tensors", (7, 5)),
+    "w8a8_int8": ("compressed-tensors", (7, 5)),
+    "fp8": ("fp8", (8, 9)),
+}
+
+# 8-bit KV cache storage needs the FP8 conversions of Ada and Hopper
+_FP8_KV_CACHE_DTYPES = {"fp8", "fp8_e4m3", "fp8_e5m2"}
+_FP8_MIN_CAPABILITY = (8, 9)
+
+@functools.lru_cache(maxsize=1)
+def _cuda_capability() -> Optional[Tuple[int, int]]:
+    """Get the compute capability of the current CUDA device, if there is one"""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return tuple(torch.cuda.get_device_capability())
+    except Exception as e:
+        logger.debug("Could not query CUDA device capability: %s", e)
+    return None
+
+def _resolve_quantization(quantization: Optional[str]) -> Optional[str]:
+    """Map a configured quantization to its vLLM method, or to None if the device can't run it"""
+    if quantization is None or quantization.lower() not in _W8A8_QUANTIZATION:
+        return quantization
+    
+    method, min_capability = _W8A8_QUANTIZATION[quantization.lower()]
+    capability = _cuda_capability()
+    if capability is None or capability < min_capability:
+        logger.warning(
+            "%s quantization needs compute capability %d.%d, device has %s; loading unquantized weights",
+            quantization, min_capability[0], min_capability[1], capability
+        )
+        return None
+    
+    return method
+
+def _resolve_kv_cache_dtype(kv_cache_dtype: str) -> str:
+    """Use the configured KV cache dtype, or the model dtype if the device can't store FP8"""
+    if kv_cache_dtype in _FP8_KV_CACHE_DTYPES:
+        capability = _cuda_capability()
+        if capability is None or capability < _FP8_MIN_CAPABILITY:
+            logger.warning(
+                "%s KV cache needs compute capability 8.9, device has %s; using auto", kv_cache_dtype, capability
+            )
+            return "auto"
+    
+    return kv_cache_dtype
+
+def _function_call_schema(functions: List[FunctionDefinition]) -> Dict[str, Any]:
+    """JSON schema for a reply that either calls one of the functions or answers in text"""
+    function_calls = [
+        {
+            "type": "object",
+            "properties": {
+                "function": {"const": func.name},
+                "parameters": func.to_openai_schema()["parameters"]
+            },
+            "required": ["function", "parameters"]
+        }
+        for func in functions
+    ]
+    text_answer = {
+        "type": "object",
+        "properties": {"content": {"type": "string"}},
+        "required": ["content"]
+    }
+    return {"anyOf": function_calls + [text_answer]}
+
+def _parse_guided_reply(response: str) -> Optional[Dict[str, Any]]:
+    """Parse a reply decoded against the function call schema, if it is valid JSON"""
+    try:
+        reply = loads_json(response)
+    except ValueError:
+        return None
+    
+    if not isinstance(reply, dict):
+        return None
+    
+    if "function" in reply:
+        return {
+            "content": None,
+            "function_call": {
+                "name": reply["function"],
+                "arguments": reply.get("parameters", {})
+            }
+        }
+    
+    if "content" in reply:
+        return {"content": reply["content"]}
+    
+    return None
+
+def _parse_function_call(response: str) -> Optional[Dict[str, Any]]:
+    """Extract a function call from a fenced JSON block in a response, if there is a valid one"""
+    match = _FUNCTION_CALL_PATTERN.search(response)
+    if match is None:
+        return None
+    
+    try:
+        function_call = loads_json(match.group(1))
+        return {
+            "name": function_call["function"],
+            "arguments": function_call["parameters"]
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        # Malformed calls are returned to the caller as plain text
+        logger.debug("Could not parse function call from response: %s", e)
+        return None
+
 
 class VLLMAdapter(ModelContextProtocol):
     """vLLM implementation of the Model Context Protocol"""
     
+    __slots__ = (
+        "tensor_parallel_size",
+        "gpu_memory_utilization",
+        "quantization",
+        "kv_cache_dtype",
+        "quantization_param_path",
+        "engine",
+        "tokenizer",
+        "chat_template",
+        "embedding_model",
+        "embedding_batch_size",
+    )
+    
     def __init__(self, model_name: str, model_config: Dict[str, Any] = None):
         """Initialize the vLLM adapter"""
         super().__init__(model_name, model_config)
@@ -49,26 +215,86 @@ class VLLMAdapter(ModelContextProtocol):
         # Extract configuration parameters
         self.tensor_parallel_size = model_config.get("tensor_parallel_size", 1)
         self.gpu_memory_utilization = model_config.get("gpu_memory_utilization", 0.9)
-        self.quantization = model_config.get("quantization", None)
+        quantization = model_config.get("quantization", None)
+        if model_config.get("fp8_block_quant", False):
+            quantization = "fp8"
+        self.quantization = _resolve_quantization(quantization)
+        self.kv_cache_dtype = _resolve_kv_cache_dtype(model_config.get("kv_cache_dtype", "auto"))
+        self.quantization_param_path = model_config.get("quantization_param_path", None)
         
         # Initialize the vLLM engine
         self.engine = self._initialize_engine()
+        self.tokenizer = self._get_tokenizer()
+        self.chat_template = getattr(self.tokenizer, "chat_template", None)
+        
+        # Embedding model, loaded on first use
+        self.embedding_model = None
+        self.embedding_batch_size = model_config.get("embedding_batch_size", 64)
     
     def _initialize_engine(self) -> AsyncLLMEngine:
-        """Initialize the vLLM engine with the specified configuration"""
-        # Configure engine arguments
-        engine_args = AsyncEngineArgs(
-            model=self.model_name,
-            tensor_parallel_size=self.tensor_parallel_size,
-            gpu_memory_utilization=self.gpu_memory_utilization,
-            quantization=self.quantization,
-            max_model_len=self.model_config.get("max_context_size", 8192)
+        """Get the vLLM engine for the specified configuration, creating it if no adapter has yet"""
+        max_model_len = self.model_config.get("max_context_size", 8192)
+        engine_key = (
+            self.model_name,
+            self.tensor_parallel_size,
+            self.gpu_memory_utilization,
+            self.quantization,
+            self.kv_cache_dtype,
+            self.quantization_param_path,
+            max_model_len,
+            self.model_config.get("enable_prefix_caching", True)
         )
         
-        # Create the engine
-        return AsyncLLMEngine.from_engine_args(engine_args)
+        # Held while creating, so adapters initialized concurrently don't both load the model
+        with _ENGINE_CACHE_LOCK:
+            engine = _ENGINE_CACHE.get(engine_key)
+            if engine is not None:
+                return engine
+            
+            # Scaling factors file for FP8 KV caches; only passed when configured, since
+            # recent vLLM releases no longer accept the argument
+            optional_args = {}
+            if self.quantization_param_path is not None:
+                optional_args["quantization_param_path"] = self.quantization_param_path
+            
+            # Configure engine arguments
+            engine_args = AsyncEngineArgs(
+                model=self.model_name,
+                tensor_parallel_size=self.tensor_parallel_size,
+                gpu_memory_utilization=self.gpu_memory_utilization,
+                quantization=self.quantization,
+                kv_cache_dtype=self.kv_cache_dtype,
+                max_model_len=max_model_len,
+                # Requests sharing a prompt prefix, such as the function definitions, reuse its KV cache blocks
+                enable_prefix_caching=self.model_config.get("enable_prefix_caching", True),
+                **optional_args
+            )
+            
+            # Create the engine
+            engine = AsyncLLMEngine.from_engine_args(engine_args)
+            _ENGINE_CACHE[engine_key] = engine
+            return engine
+    
+    def _get_tokenizer(self):
+        """Get the fast Hugging Face tokenizer the engine loaded for the model"""
+        try:
+            return self.engine.engine.tokenizer.tokenizer
+        except AttributeError:
+            logger.warning("vLLM engine does not expose its tokenizer; token counts will be estimated")
+            return None
+    
+    def get_engine_config(self) -> Dict[str, Any]:
+        """Get the memory and quantization settings the engine was started with"""
+        return {
+            "tensor_parallel_size": self.tensor_parallel_size,
+            "gpu_memory_utilization": self.gpu_memory_utilization,
+            "quantization": self.quantization,
+            "kv_cache_dtype": self.kv_cache_dtype,
+            "quantization_param_path": self.quantization_param_path,
+            "max_context_size": self.get_max_context_size()
+        }
     
-    def _detect_capabilities(self) -> List[ModelCapability]:
+    def _detect_capabilities(self) -> FrozenSet[ModelCapability]:
         """Detect the capabilities of the vLLM model"""
         capabilities = [
             ModelCapability.STREAMING,
@@ -76,23 +302,41 @@ class VLLMAdapter(ModelContextProtocol):
         ]
         
         # Check for function calling support based on model name
-        if "mistral" in self.model_name.lower() or "claude" in self.model_name.lower() or "gpt" in self.model_name.lower():
+        if _FUNCTION_CALLING_MODEL_PATTERN.search(self.model_name):
             capabilities.append(ModelCapability.FUNCTION_CALLING)
         
         # Check for code generation support
-        if "code" in self.model_name.lower() or "starcoder" in self.model_name.lower() or "codellama" in self.model_name.lower():
+        if _CODE_MODEL_PATTERN.search(self.model_name):
             capabilities.append(ModelCapability.CODE_GENERATION)
         
-        return capabilities
+        return frozenset(capabilities)
     
-    def _create_prompt_from_context(self, context: ModelContext) -> str:
-        """Create a prompt string from the context for non-chat models"""
+    def _system_content(self, context: ModelContext, function_block: Optional[str] = None) -> Optional[str]:
+        """Combine the system prompt with any function definitions into one system message"""
+        parts = [text for text in (context.system_prompt, function_block) if text]
+        return "\n\n".join(parts) if parts else None
+    
+    def _create_prompt_from_context(self, context: ModelContext, function_block: Optional[str] = None) -> str:
+        """Create a prompt string from the context in the model's chat format"""
+        # Models that ship a chat template get the prompt format they were trained on;
+        # the tokenizer compiles the template once and caches it
+        if self.chat_template is not None:
+            try:
+                return self.tokenizer.apply_chat_template(
+                    self._prepare_chat_messages(context, function_block),
+                    tokenize=False,
+                    add_generation_prompt=True
+                )
+            except Exception as e:
+                logger.debug("Chat template could not render the context, using plain prompt: %s", e)
+        
         # For basic completion models, concatenate messages
         parts = []
         
         # Add system prompt if available
-        if context.system_prompt:
-            parts.append(f"System: {context.system_prompt}\n\n")
+        system_content = self._system_content(context, function_block)
+        if system_content:
+            parts.append(f"System: {system_content}\n\n")
         
         # Add all messages
         for message in context.messages:
@@ -114,61 +358,69 @@ class VLLMAdapter(ModelContextProtocol):
         
         return "".join(parts)
     
-    def _prepare_chat_messages(self, context: ModelContext) -> List[Dict[str, Any]]:
+    def _prepare_chat_messages(self, context: ModelContext,
+                               function_block: Optional[str] = None) -> List[Dict[str, Any]]:
         """Prepare chat messages for models that support chat format"""
-        messages = []
+        # The context builds new message dicts on every access, so only the tuple needs converting
+        messages = list(context.messages)
         
         # Add system message if provided
-        if context.system_prompt:
-            messages.append({"role": "system", "content": context.system_prompt})
-        
-        # Add all other messages
-        for message in context.messages:
-            # Deep copy the message to avoid modifying the original
-            message_copy = message.copy()
-            messages.append(message_copy)
+        system_content = self._system_content(context, function_block)
+        if system_content:
+            return [{"role": "system", "content": system_content}] + messages
         
         return messages
     
-    def _prepare_sampling_params(self, context: ModelContext) -> SamplingParams:
-        """Prepare sampling parameters for generation"""
+    def _prepare_sampling_params(self, context: ModelContext, guided: bool = False) -> SamplingParams:
+        """Prepare sampling parameters for generation, constraining chat replies when guided"""
+        guided_params = {}
+        if guided and context.functions and GUIDED_DECODING_AVAILABLE:
+            # Constrain the reply to a valid function call or text answer, so no fences are generated
+            guided_params["guided_decoding"] = GuidedDecodingParams(json=_function_call_schema(context.functions))
+        
         return SamplingParams(
             temperature=context.temperature,
             top_p=context.top_p,
             top_k=context.top_k,
             max_tokens=context.max_tokens,
             stop_token_ids=None,  # Use default stop tokens for the model
-            stop=["User:", "\nUser:"]  # Stop on user turns
+            stop=["User:", "\nUser:"],  # Stop on user turns
+            **guided_params
         )
     
     def _create_function_calling_prompt(self, context: ModelContext) -> str:
-        """Create a function calling prompt for models without native function calling"""
-        # Add function definitions to the prompt
+        """Create a prompt that describes the context's functions in the system message"""
+        # Add function definitions to the prompt, in name order so the same set of
+        # functions always renders the same text and hits the engine's prefix cache
         function_definitions = []
-        for func in context.functions:
-            param_descriptions = []
-            for param in func.parameters:
-                required_str = "required" if param.required else "optional"
-                param_descriptions.append(f"- {param.name}: {param.description} ({param.type}, {required_str})")
-            
+        for func in sorted(context.functions, key=lambda func: func.name):
             function_definitions.append(
                 f"Function: {func.name}\n"
                 f"Description: {func.description}\n"
-                f"Parameters:\n" + "\n".join(param_descriptions)
+                f"Parameters:\n" + "\n".join(func.param_lines)
             )
         
         functions_text = "\n\n".join(function_definitions)
         
-        # Create the base prompt
-        base_prompt = self._create_prompt_from_context(context)
-        
-        # Add the function calling instructions
-        return (
+        # The definitions and instructions go into the system message, so a chat template
+        # renders them inside the system turn rather than ahead of its special tokens
+        function_block = (
             f"You have access to the following functions:\n\n{functions_text}\n\n"
-            "To call a function, respond in the following format:\n"
-            "```json\n{\"function\": \"function_name\", \"parameters\": {\"param1\": \"value1\", \"param2\": \"value2\"}}\n```\n\n"
-            f"{base_prompt}"
+            f"{_FUNCTION_CALL_INSTRUCTIONS}"
         )
+        return self._create_prompt_from_context(context, function_block)
+    
+    async def _generate_text(self, prompt: str, sampling_params: SamplingParams) -> str:
+        """Submit a request to the engine and wait for its finished text.
+        
+        Each request is added to the running engine under its own id, so concurrent
+        requests are merged into the same decoding steps by continuous batching.
+        """
+        final_output = None
+        async for output in self.engine.generate(prompt, sampling_params, request_id=uuid4().hex):
+            final_output = output
+        
+        return final_output.outputs[0].text if final_output is not None else ""
     
     async def generate_completion(self, context: ModelContext) -> str:
         """Generate a text completion using vLLM"""
@@ -179,121 +431,87 @@ class VLLMAdapter(ModelContextProtocol):
         sampling_params = self._prepare_sampling_params(context)
         
         # Generate the completion
-        results = await self.engine.generate(prompt, sampling_params)
-        
-        # Extract and return the generated text
-        generated_text = results[0].outputs[0].text
+        return await self._generate_text(prompt, sampling_params)
+    
+    async def stream_completion(self, context: ModelContext) -> AsyncIterator[str]:
+        """Generate a text completion using vLLM, yielding new text as it is decoded"""
+        prompt = self._create_prompt_from_context(context)
+        sampling_params = self._prepare_sampling_params(context)
         
-        return generated_text
+        # Outputs carry the full text so far; only the part not yet sent is yielded
+        sent_length = 0
+        async for output in self.engine.generate(prompt, sampling_params, request_id=uuid4().hex):
+            text = output.outputs[0].text
+            if len(text) > sent_length:
+                yield text[sent_length:]
+                sent_length = len(text)
     
     async def generate_chat_response(self, context: ModelContext) -> Dict[str, Any]:
         """Generate a chat response with possible function calls"""
-        # Check if the model supports function calling
-        if ModelCapability.FUNCTION_CALLING in self.capabilities and context.functions:
-            # For models with native function calling support
-            messages = self._prepare_chat_messages(context)
-            
-            # Convert function definitions to the format expected by the model
-            function_defs = []
-            for func in context.functions:
-                function_defs.append({
-                    "name": func.name,
-                    "description": func.description,
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            param.name: {
-                                "type": param.type,
-                                "description": param.description
-                            } for param in func.parameters
-                        },
-                        "required": [param.name for param in func.parameters if param.required]
-                    }
-                })
-            
-            # Add function definitions to sampling params
-            sampling_params = self._prepare_sampling_params(context)
-            # This would need to be customized based on how vLLM implements function calling
-            
-            # Generate with function calling (implementation depends on vLLM's API)
-            results = await self.engine.generate(messages, sampling_params)
-            
-            # Extract the response
-            response = results[0].outputs[0].text
-            
-            # Parse for function calls
-            try:
-                # Check if the response contains a function call
-                if "```json" in response:
-                    # Extract the JSON part
-                    json_start = response.find("```json") + 7
-                    json_end = response.find("```", json_start)
-                    json_str = response[json_start:json_end].strip()
-                    
-                    # Parse the JSON
-                    function_call = json.loads(json_str)
-                    
-                    return {
-                        "content": None,
-                        "function_call": {
-                            "name": function_call["function"],
-                            "arguments": function_call["parameters"]
-                        }
-                    }
-                else:
-                    return {"content": response}
-            except Exception:
-                # If parsing fails, return the raw text
-                return {"content": response}
+        # Function definitions always go into the system message, so every model sees their
+        # names, descriptions and parameters whether or not guided decoding constrains the reply
+        if context.functions:
+            prompt = self._create_function_calling_prompt(context)
         else:
-            # For models without function calling, we'll simulate it
-            if context.functions:
-                prompt = self._create_function_calling_prompt(context)
-            else:
-                prompt = self._create_prompt_from_context(context)
-            
-            # Set up sampling parameters
-            sampling_params = self._prepare_sampling_params(context)
-            
-            # Generate the completion
-            results = await self.engine.generate(prompt, sampling_params)
-            
-            # Extract the generated text
-            response = results[0].outputs[0].text
+            prompt = self._create_prompt_from_context(context)
+        
+        # Set up sampling parameters
+        sampling_params = self._prepare_sampling_params(context, guided=True)
+        
+        # Generate the completion
+        response = await self._generate_text(prompt, sampling_params)
+        
+        # Guided replies are plain JSON; anything else falls back to parsing fenced blocks
+        if context.functions and GUIDED_DECODING_AVAILABLE:
+            reply = _parse_guided_reply(response)
+            if reply is not None:
+                return reply
+        
+        # Parse for function calls, returning the raw text if there is none
+        function_call = _parse_function_call(response)
+        if function_call is None:
+            return {"content": response}
+        
+        return {"content": None, "function_call": function_call}
+    
+    def _get_embedding_model(self):
+        """Get or create the sentence transformer embedding model"""
+        if self.embedding_model is None:
+            # vLLM doesn't serve embeddings for generative models, so they come from sentence-transformers
+            from sentence_transformers import SentenceTransformer
             
-            # Try to parse function calls from the response
-            try:
-                if "```json" in response:
-                    # Extract the JSON part
-                    json_start = response.find("```json") + 7
-                    json_end = response.find("```", json_start)
-                    json_str = response[json_start:json_end].strip()
-                    
-                    # Parse the JSON
-                    function_call = json.loads(json_str)
-                    
-                    return {
-                        "content": None,
-                        "function_call": {
-                            "name": function_call["function"],
-                            "arguments": function_call["parameters"]
-                        }
-                    }
-                else:
-                    return {"content": response}
-            except Exception:
-                # If parsing fails, return the raw text
-                return {"content": response}
+            self.embedding_model = SentenceTransformer(
+                self.model_config.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2")
+            )
+        
+        return self.embedding_model
     
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for the provided texts"""
-        # vLLM doesn't natively support embeddings, so we'd need to use a different library
-        # This is a placeholder - in a real implementation, you might use SentenceTransformers or another library
-        raise NotImplementedError("Embedding generation is not implemented in the vLLM adapter")
+        if not texts:
+            return []
+        
+        # Encode every text in batched model calls, off the event loop
+        embeddings = await asyncio.to_thread(
+            self._get_embedding_model().encode,
+            texts,
+            batch_size=self.embedding_batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        
+        return embeddings.tolist()
     
     def estimate_tokens(self, text: str) -> int:
-        """Estimate the number of tokens in the text"""
-        # vLLM has tokenization utilities we could use here
-        # This is a simple approximation
-        words = text.split()
-        return int(len(words) * 1.3)  # Approximate token count 
\ No newline at end of file
+        """Count the tokens in the text with the model's tokenizer"""
+        if self.tokenizer is None:
+            return int(len(text.split()) * 1.3)  # Approximate token count
+        
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+    
+    def estimate_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count the tokens in each text, tokenizing the whole batch in one call"""
+        if self.tokenizer is None or not texts:
+            return super().estimate_tokens_batch(texts)
+        
+        return [len(ids) for ids in self.tokenizer(texts, add_special_tokens=False).input_ids] 
\ No newline at end of file
@@ -6,13 +6,26 @@ including all routes, middleware, and dependencies.
 """
 
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+try:
+    from fastapi.responses import ORJSONResponse
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Serialize responses with orjson when it is installed
+ResponseClass = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 
 # Import routes
-from .routes import setup_routes
+from .routes import setup_routes, routes_lifespan
 
 # Configure logging
 logging.basicConfig(
@@ -36,11 +49,26 @@ def setup_data_directories():
         Path(directory).mkdir(parents=True, exist_ok=True)
 
 
+# Startup and shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup tasks before serving and shutdown tasks after"""
+    # Set up data directories without blocking the event loop
+    await asyncio.to_thread(setup_data_directories)
+    
+    async with routes_lifespan(app):
+        logger.info("Application started successfully")
+        yield
+        logger.info("Application shutting down")
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Genius Navigator Agentic AI Backend",
     description="Backend API for Genius Navigator, providing agentic AI capabilities",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ResponseClass,
 )
 
 
@@ -88,47 +116,49 @@ async def health_check():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
-    return {
-        "error": exc.detail,
-        "status_code": exc.status_code,
-    }
+    return ResponseClass(
+        {
+            "error": exc.detail,
+            "status_code": exc.status_code,
+        },
+        status_code=exc.status_code,
+        headers=getattr(exc, "headers", None),
+    )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return {
-        "error": "Internal server error",
-        "status_code": 500,
-        "detail": str(exc) if os.getenv("DEBUG", "false").lower() == "true" else None,
-    }
-
-
-# Startup and shutdown events
-@app.on_event("startup")
-async def startup_event():
-    """Run startup tasks"""
-    # Set up data directories
-    setup_data_directories()
-    
-    logger.info("Application started successfully")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run shutdown tasks"""
-    logger.info("Application shutting down")
+    debug = os.getenv("DEBUG", "false").lower() == "true"
+    return ResponseClass(
+        {
+            "error": "Internal server error",
+            "status_code": 500,
+            "detail": str(exc) if debug else None,
+        },
+        status_code=500,
+    )
 
 
 # Run the application
 if __name__ == "__main__":
     import uvicorn
     
-    # Run the server
+    # Only watch the filesystem for changes during development
+    dev_mode = os.getenv("DEV") == "1"
+    
+    # Each worker process loads its own LLM engine, so keep a single worker
+    # unless the deployment is known to serve without a GPU-bound adapter
+    workers = 1 if dev_mode else int(os.getenv("WORKERS", "1"))
+    
+    # Run the server, using uvloop and httptools when they are installed
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        loop="auto",
+        http="auto",
+        reload=dev_mode,
+        workers=workers,
     )
\ No newline at end of file
@@ -4,12 +4,27 @@ API Routes for Genius Navigator Backend
 This module initializes and provides all API routes for the backend.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
-from .workflows.api import setup_workflow_routes
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 
-def setup_routes(app: FastAPI) -> None:
+def setup_routes(app: "FastAPI") -> None:
     """Set up all API routes for the application"""
+    # Route modules are imported here rather than with the package, so helpers such as
+    # workflows.executions can be imported without FastAPI or the agents package
+    from .workflows.api import setup_workflow_routes
+    
     # Set up workflow routes
-    setup_workflow_routes(app) 
\ No newline at end of file
+    setup_workflow_routes(app)
+
+
+@asynccontextmanager
+async def routes_lifespan(app: "FastAPI"):
+    """Run the startup and shutdown work of all API routes"""
+    from .workflows.api import workflow_lifespan
+    
+    async with workflow_lifespan(app):
+        yield
@@ -5,12 +5,17 @@ This module provides API endpoints for creating, managing, and executing
 workflow instances using the workflow engine.
 """
 
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Any
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from uuid import uuid4
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, Field
 
 # Import workflow components
-from ...agents.workflows.registry import get_workflow_registry
+from ...agents.workflows.registry import WORKFLOW_REGISTRY_DIR, WorkflowRegistry, get_workflow_registry
 from ...agents.workflows.engine import GraphWorkflowEngine
 from ...agents.workflows.templates.seo_workflow import (
     create_seo_workflow_template,
@@ -21,6 +26,9 @@ from ...agents.workflows.templates.seo_workflow import (
 # Import agent and tool registries
 from ...agents.core.base_agent import AgentCore
 from ...agents.tools import ToolRegistry
+from .executions import ExecutionStore
+
+logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter(prefix="/workflows", tags=["workflows"])
@@ -106,8 +114,86 @@ class WorkflowResult(BaseModel):
     error: Optional[str] = None
 
 
-# Active executions tracking
-active_executions: Dict[str, Dict[str, Any]] = {}
+# Workflow registry and execution store shared by all endpoints, bound once at startup by workflow_lifespan
+_registry: Optional[WorkflowRegistry] = None
+_active_executions: Optional[ExecutionStore] = None
+
+
+def _get_registry() -> WorkflowRegistry:
+    """Get the workflow registry bound at startup"""
+    if _registry is None:
+        raise RuntimeError("Workflow routes used before workflow_lifespan started")
+    return _registry
+
+
+def _get_active_executions() -> ExecutionStore:
+    """Get the execution store bound at startup"""
+    if _active_executions is None:
+        raise RuntimeError("Workflow routes used before workflow_lifespan started")
+    return _active_executions
+
+
+# Execution workers: a fixed pool bounds how many workflows run at once
+WORKFLOW_WORKERS = int(os.environ.get("GENIUS_WF_WORKERS", min(4, os.cpu_count() or 1)))
+
+_execution_queue: Optional[asyncio.Queue] = None
+_execution_workers: List[asyncio.Task] = []
+_workflow_engine: Optional[GraphWorkflowEngine] = None
+
+
+def _get_workflow_engine() -> GraphWorkflowEngine:
+    """Get the workflow engine shared by all workers, creating it on first use"""
+    global _workflow_engine
+    
+    if _workflow_engine is None:
+        _workflow_engine = GraphWorkflowEngine(
+            agent_registry=get_agent_registry(),
+            tool_registry=get_tool_registry()
+        )
+    
+    return _workflow_engine
+
+
+def _get_execution_queue() -> asyncio.Queue:
+    """Get the queue of pending executions, starting its workers on first use"""
+    global _execution_queue
+    
+    if _execution_queue is None:
+        _execution_queue = asyncio.Queue()
+        _execution_workers.extend(
+            asyncio.create_task(_execution_worker(_execution_queue))
+            for _ in range(WORKFLOW_WORKERS)
+        )
+    
+    return _execution_queue
+
+
+async def _stop_execution_workers() -> None:
+    """Cancel the execution workers"""
+    global _execution_queue
+    
+    for worker in _execution_workers:
+        worker.cancel()
+    await asyncio.gather(*_execution_workers, return_exceptions=True)
+    
+    _execution_workers.clear()
+    _execution_queue = None
+
+
+async def reload_workflow_registry():
+    """Reload the workflow registry from storage.
+    
+    Not routed: the backend has no admin authentication, so this is for admin tooling only.
+    """
+    registry = _get_registry()
+    
+    # Reloading scans and parses every stored workflow, so it runs off the event loop
+    await asyncio.to_thread(registry.reload)
+    
+    return {
+        "status": "reloaded",
+        "count": len(registry.workflows)
+    }
 
 
 # Routes
@@ -117,9 +203,7 @@ async def list_workflows(
     is_template: Optional[bool] = Query(None)
 ):
     """List available workflows with optional filtering"""
-    registry = get_workflow_registry("./data/workflows")
-    
-    workflows = registry.list_workflows(tags=tags, is_template=is_template)
+    workflows = _get_registry().list_workflows(tags=tags, is_template=is_template)
     
     return {
         "workflows": workflows,
@@ -130,7 +214,7 @@ async def list_workflows(
 @router.get("/{workflow_id}", response_model=WorkflowMetadata)
 async def get_workflow(workflow_id: str):
     """Get details of a specific workflow"""
-    registry = get_workflow_registry("./data/workflows")
+    registry = _get_registry()
     
     # Get the workflow
     workflow = registry.get_workflow(workflow_id)
@@ -150,7 +234,7 @@ async def get_workflow(workflow_id: str):
 @router.post("/instances", response_model=WorkflowInstanceResponse)
 async def create_workflow_instance(request: WorkflowInstanceRequest):
     """Create a new workflow instance from a template"""
-    registry = get_workflow_registry("./data/workflows")
+    registry = _get_registry()
     
     # Create the instance
     instance_id = registry.create_workflow_instance(
@@ -177,9 +261,7 @@ async def create_workflow_instance(request: WorkflowInstanceRequest):
 async def create_seo_workflow(request: SEOWorkflowRequest):
     """Create a new SEO content optimization workflow instance"""
     # Initialize the SEO workflow template if it doesn't exist
-    registry = get_workflow_registry("./data/workflows")
-    
-    if "seo_content_optimization_workflow" not in registry.workflows:
+    if "seo_content_optimization_workflow" not in _get_registry().workflows:
         create_seo_workflow_template()
     
     # Create a workflow instance
@@ -202,37 +284,28 @@ async def create_seo_workflow(request: SEOWorkflowRequest):
 @router.post("/{workflow_id}/execute", response_model=WorkflowExecuteResponse)
 async def execute_workflow(
     workflow_id: str,
-    background_tasks: BackgroundTasks,
     initial_context: Dict[str, Any] = None
 ):
     """Execute a workflow asynchronously"""
-    registry = get_workflow_registry("./data/workflows")
-    
     # Get the workflow
-    workflow = registry.get_workflow(workflow_id)
+    workflow = _get_registry().get_workflow(workflow_id)
     
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
     # Generate execution ID
-    from uuid import uuid4
     execution_id = str(uuid4())
     
     # Store execution information
-    active_executions[execution_id] = {
+    _get_active_executions().add(execution_id, {
         "workflow_id": workflow_id,
         "status": "queued",
         "results": None,
         "error": None
-    }
+    })
     
-    # Schedule background task
-    background_tasks.add_task(
-        _execute_workflow_background,
-        execution_id=execution_id,
-        workflow_id=workflow_id,
-        initial_context=initial_context or {}
-    )
+    # Queue the execution for the next free worker
+    await _get_execution_queue().put((execution_id, workflow_id, initial_context or {}))
     
     return {
         "execution_id": execution_id,
@@ -245,10 +318,10 @@ async def execute_workflow(
 @router.get("/executions/{execution_id}", response_model=WorkflowResult)
 async def get_execution_result(execution_id: str):
     """Get the results of a workflow execution"""
-    if execution_id not in active_executions:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    execution_info = await _get_active_executions().get(execution_id)
     
-    execution_info = active_executions[execution_id]
+    if execution_info is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
     
     return {
         "execution_id": execution_id,
@@ -259,24 +332,28 @@ async def get_execution_result(execution_id: str):
     }
 
 
-# Background task function
+# Background execution
+async def _execution_worker(queue: asyncio.Queue):
+    """Run queued workflow executions one after another"""
+    while True:
+        execution_id, workflow_id, initial_context = await queue.get()
+        try:
+            await _execute_workflow_background(execution_id, workflow_id, initial_context)
+        finally:
+            queue.task_done()
+
+
 async def _execute_workflow_background(execution_id: str, workflow_id: str, initial_context: Dict[str, Any]):
     """Execute a workflow in the background"""
+    execution_info = await _get_active_executions().get(execution_id)
+    
     try:
         # Update status
-        active_executions[execution_id]["status"] = "running"
+        execution_info["status"] = "running"
         
         # Get dependencies
-        registry = get_workflow_registry("./data/workflows")
-        workflow = registry.get_workflow(workflow_id)
-        agent_registry = get_agent_registry()
-        tool_registry = get_tool_registry()
-        
-        # Initialize engine
-        engine = GraphWorkflowEngine(
-            agent_registry=agent_registry,
-            tool_registry=tool_registry
-        )
+        workflow = _get_registry().get_workflow(workflow_id)
+        engine = _get_workflow_engine()
         
         # Execute workflow
         result = await engine.execute_workflow(
@@ -285,25 +362,39 @@ async def _execute_workflow_background(execution_id: str, workflow_id: str, init
         )
         
         # Update execution info
-        active_executions[execution_id]["status"] = "completed"
-        active_executions[execution_id]["results"] = result
+        execution_info["status"] = "completed"
+        execution_info["results"] = result
     
     except Exception as e:
         # Handle errors
-        active_executions[execution_id]["status"] = "error"
-        active_executions[execution_id]["error"] = str(e)
-        
-        import logging
-        logging.error(f"Error executing workflow {workflow_id}: {e}")
+        execution_info["status"] = "error"
+        execution_info["error"] = str(e)
+        logger.error("Error executing workflow %s: %s", workflow_id, e)
+    
+    finally:
+        await _get_active_executions().finish(execution_id)
 
 
 # Include this router in your main API router
 def setup_workflow_routes(app):
     """Set up the workflow routes in the main FastAPI app"""
     app.include_router(router)
+
+
+@asynccontextmanager
+async def workflow_lifespan(app):
+    """Load the workflow registry, initialize templates and run the execution workers for the app's lifetime"""
+    global _registry, _active_executions
+    
+    # Loading parses every stored workflow and template creation writes to disk, so both run off the event loop
+    _registry = await asyncio.to_thread(get_workflow_registry, WORKFLOW_REGISTRY_DIR)
+    _active_executions = ExecutionStore(WORKFLOW_REGISTRY_DIR / "executions")
+    await asyncio.to_thread(create_seo_workflow_template)
+    _get_execution_queue()
     
-    # Initialize the workflow templates
-    @app.on_event("startup")
-    async def initialize_workflow_templates():
-        """Initialize workflow templates at startup"""
-        create_seo_workflow_template() 
\ No newline at end of file
+    try:
+        yield
+    finally:
+        await _stop_execution_workers()
+        _registry = None
+        _active_executions = None 
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Workflow Execution Store
+
+This module tracks workflow executions for the workflow API, keeping finished
+executions in memory and writing evicted ones to disk.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+from uuid import UUID
+
+from ...utils.json_utils import dumps_json, loads_json
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionStore:
+    """Tracks workflow executions, keeping a bounded number of finished ones in memory.
+    
+    Finished executions are evicted least recently used first, or once idle for longer
+    than the TTL, and are written to disk so their results can still be served until
+    they are older than the retention period.
+    """
+    
+    def __init__(
+        self,
+        storage_path: Path,
+        max_finished: int = 10_000,
+        ttl: float = 3600,
+        retention: float = 7 * 24 * 3600
+    ):
+        """Initialize the store with where evicted executions are written and its limits"""
+        self.storage_path = storage_path
+        self.max_finished = max_finished
+        self.ttl = ttl
+        self.retention = retention
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._finished: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._spilling: Dict[str, Dict[str, Any]] = {}
+        self._next_cleanup = 0.0
+    
+    def add(self, execution_id: str, execution_info: Dict[str, Any]) -> None:
+        """Track a new execution until it finishes"""
+        self._pending[execution_id] = execution_info
+    
+    async def finish(self, execution_id: str) -> None:
+        """Move a finished execution into the bounded store"""
+        execution_info = self._pending.pop(execution_id, None)
+        if execution_info is not None:
+            self._finished[execution_id] = (time.monotonic(), execution_info)
+        await self._evict()
+    
+    async def get(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Get an execution by ID, reading it back from disk if it was evicted"""
+        execution_info = self._pending.get(execution_id)
+        if execution_info is not None:
+            return execution_info
+        
+        await self._evict()
+        entry = self._finished.get(execution_id)
+        if entry is not None:
+            self._finished[execution_id] = (time.monotonic(), entry[1])
+            self._finished.move_to_end(execution_id)
+            return entry[1]
+        
+        # Executions still being written out are served from memory until the write completes
+        execution_info = self._spilling.get(execution_id)
+        if execution_info is not None:
+            return execution_info
+        
+        return await asyncio.to_thread(self._load, execution_id)
+    
+    async def _evict(self) -> None:
+        """Drop finished executions over the size limit or past the TTL, writing them out off the event loop"""
+        expiry = time.monotonic() - self.ttl
+        evicted = []
+        while self._finished:
+            execution_id, (last_used, execution_info) = next(iter(self._finished.items()))
+            if len(self._finished) <= self.max_finished and last_used > expiry:
+                break
+            
+            self._finished.popitem(last=False)
+            self._spilling[execution_id] = execution_info
+            evicted.append((execution_id, execution_info))
+        
+        if not evicted:
+            return
+        
+        try:
+            await asyncio.to_thread(self._save, evicted)
+        finally:
+            for execution_id, _ in evicted:
+                self._spilling.pop(execution_id, None)
+    
+    def _path(self, execution_id: str) -> Optional[Path]:
+        """Get the file for an execution, or None if the ID is not a valid execution ID"""
+        try:
+            return self.storage_path / f"{UUID(execution_id)}.json"
+        except ValueError:
+            return None
+    
+    def _save(self, executions: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Write executions to disk, then delete expired files at most once per TTL"""
+        try:
+            self.storage_path.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            logger.error("Error creating workflow execution directory %s: %s", self.storage_path, e)
+            return
+        
+        for execution_id, execution_info in executions:
+            try:
+                self._path(execution_id).write_bytes(dumps_json(execution_info, default=str))
+            except Exception as e:
+                logger.error("Error saving workflow execution %s: %s", execution_id, e)
+        
+        if time.monotonic() >= self._next_cleanup:
+            self._next_cleanup = time.monotonic() + self.ttl
+            self._delete_expired()
+    
+    def _delete_expired(self) -> None:
+        """Delete written executions older than the retention period"""
+        expiry = time.time() - self.retention
+        for path in self.storage_path.glob("*.json"):
+            try:
+                if path.stat().st_mtime < expiry:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error("Error deleting workflow execution file %s: %s", path, e)
+    
+    def _load(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Read an evicted execution from disk, if there is one"""
+        path = self._path(execution_id)
+        if path is None or not path.is_file():
+            return None
+        
+        try:
+            return loads_json(path.read_bytes())
+        except Exception as e:
+            logger.error("Error loading workflow execution %s: %s", execution_id, e)
+            return None
@@ -0,0 +1,54 @@
+"""
+JSON helpers for the Python backend
+
+This module serializes and parses JSON with orjson when it is installed, and falls
+back to the standard library json module otherwise.
+"""
+
+from typing import Any, Callable, Optional, Union
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps_json(data: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, compact unless indent is set.
+    
+    Indented output is meant for files and prompts, so like json.dumps it also accepts
+    non-string dict keys.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS if indent else None
+        return orjson.dumps(data, default=default, option=option)
+    
+    if indent:
+        text = json.dumps(data, indent=2, ensure_ascii=False, default=default)
+    else:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=default)
+    return text.encode("utf-8")
+
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    """Parse JSON bytes or text.
+    
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json_file(path: str) -> Any:
+    """Load a JSON file"""
+    with open(path, "rb") as f:
+        return loads_json(f.read())
+
+
+def save_json_file(path: str, data: Any) -> None:
+    """Save data to an indented JSON file"""
+    with open(path, "wb") as f:
+        f.write(dumps_json(data, indent=True))
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+import respx
+
+
+def _app():
+    # Imported on first use so tests that don't need the app (and its dependencies) still load
+    from backend.src.main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client():
+    # One client for the whole run, so the app lifespan starts and stops only once
+    from fastapi.testclient import TestClient
+    with TestClient(_app()) as c:
+        yield c
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def aclient():
+    # In-process async client that drives the ASGI app on the test's event loop
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def mock_http():
+    # Stub outbound n8n webhook and Hugging Face calls so no test touches the network
+    with respx.mock(assert_all_called=False) as mock:
+        mock.post(url__regex=r".*/(publish-[a-z]+|start-email-campaign)$").respond(200, json={"ok": True})
+        mock.post(url__regex=r"https://api-inference\.huggingface\.co/.*").respond(
+            200, json=[{"generated_text": "ok"}]
+        )
+        yield mock
+
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    return {"Authorization": "Bearer <valid_access_token>"}
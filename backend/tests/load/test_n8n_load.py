@@ -0,0 +1,113 @@
+"""
+Load test for the n8n webhook fan-out.
+
+Fires concurrent trigger_social_post calls at a local stub n8n server for a fixed
+duration, then reports latency percentiles and how often pooled connections were
+reused. Use it to size the client's httpx.Limits: raise max_keepalive_connections
+until p99 stops improving. Skipped unless N8N_LOAD_TEST=1, e.g.
+
+    N8N_LOAD_TEST=1 N8N_LOAD_CONCURRENCY=200 N8N_LOAD_SECONDS=60 pytest -s backend/tests/load
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+import pytest
+from backend.utils import n8n
+
+CONCURRENCY = int(os.getenv("N8N_LOAD_CONCURRENCY", "200"))
+DURATION_SECONDS = float(os.getenv("N8N_LOAD_SECONDS", "60"))
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(os.getenv("N8N_LOAD_TEST") != "1", reason="set N8N_LOAD_TEST=1 to run the n8n load test"),
+]
+
+
+@pytest.fixture
+def mock_http():
+    # The load test talks to a real local socket, so outbound HTTP is not stubbed
+    yield None
+
+
+class StubN8n:
+    """Minimal keep-alive HTTP/1.1 server answering every webhook with {"ok": true}"""
+    
+    RESPONSE = (
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: 11\r\n"
+        b"\r\n"
+        b'{"ok":true}'
+    )
+    
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+    
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                
+                self.requests += 1
+                writer.write(self.RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def test_social_post_fan_out(monkeypatch):
+    stub = StubN8n()
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0, backlog=CONCURRENCY * 2)
+    port = server.sockets[0].getsockname()[1]
+    monkeypatch.setenv("N8N_WEBHOOK_URL", f"http://127.0.0.1:{port}/webhook")
+    monkeypatch.setattr(n8n, "_client", None)
+    n8n._base_url.cache_clear()
+    
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + DURATION_SECONDS
+    
+    async def worker():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                await n8n.trigger_social_post("twitter", "Load test post")
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+    
+    async with server:
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        await n8n.close_client()
+    n8n._base_url.cache_clear()
+    
+    percentiles = statistics.quantiles(latencies, n=100)
+    # The pool opens one connection per concurrent worker up to its limit while warming up;
+    # only connections opened beyond that count against reuse, so the ratio measures pool
+    # sizing rather than how long the test ran
+    warm_up_connections = min(CONCURRENCY, n8n._MAX_CONNECTIONS)
+    reuse_ratio = 1 - max(stub.connections - warm_up_connections, 0) / stub.requests
+    print(
+        f"\n{stub.requests} requests over {stub.connections} connections "
+        f"({stub.requests / DURATION_SECONDS:.0f} req/s, reuse {reuse_ratio:.1%}); "
+        f"p50 {percentiles[49] * 1000:.1f} ms, p95 {percentiles[94] * 1000:.1f} ms, "
+        f"p99 {percentiles[98] * 1000:.1f} ms"
+    )
+    
+    assert errors == 0
+    assert reuse_ratio > 0.9
@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import httpx
+import orjson
+import pytest
+from tenacity import wait_none
+from backend.utils import n8n
+
+
+def _use_handler(monkeypatch, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://n8n.test/webhook")
+    monkeypatch.setattr(n8n, "_client", client)
+
+
+def _serve(monkeypatch, response):
+    # Serve the webhooks from a mock transport and record what was sent
+    sent = []
+    
+    def handler(request):
+        sent.append(request)
+        return response()
+    
+    _use_handler(monkeypatch, handler)
+    return sent
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    # Each test starts with a closed breaker and retries without backoff sleeps
+    breaker = n8n._CircuitBreaker()
+    monkeypatch.setattr(n8n, "_breaker", breaker)
+    monkeypatch.setattr(n8n.trigger_post_publishing.retry, "wait", wait_none())
+    return breaker
+
+
+@pytest.fixture
+def webhook_requests(monkeypatch):
+    return _serve(monkeypatch, lambda: httpx.Response(200, json={"ok": True}))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("platform", n8n.PLATFORMS)
+async def test_trigger_social_post(webhook_requests, platform):
+    result = await n8n.trigger_social_post(platform, "Hello", {"campaign": "launch"})
+    
+    assert result.ok
+    request = webhook_requests[0]
+    assert request.url == "http://n8n.test/webhook/publish-social"
+    assert orjson.loads(request.content) == {
+        "platform": platform,
+        "content": "Hello",
+        "metadata": {"campaign": "launch"}
+    }
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("body, raw", [
+    (b"Workflow was started", "Workflow was started"),
+    (b"[1, 2]", [1, 2]),
+])
+async def test_non_object_response_is_kept_raw(monkeypatch, body, raw):
+    _serve(monkeypatch, lambda: httpx.Response(200, content=body))
+    
+    result = await n8n.trigger_post_publishing("post-1")
+    
+    assert result.ok
+    assert result.raw == raw
+
+
+
+@pytest.mark.anyio
+async def test_server_errors_are_retried(monkeypatch):
+    sent = _serve(monkeypatch, lambda: httpx.Response(503))
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await n8n.trigger_post_publishing("post-1")
+    
+    assert len(sent) == 4
+
+
+@pytest.mark.anyio
+async def test_client_errors_are_not_retried(monkeypatch):
+    sent = _serve(monkeypatch, lambda: httpx.Response(404))
+    
+    with pytest.raises(httpx.HTTPStatusError):
+        await n8n.trigger_post_publishing("post-1")
+    
+    assert len(sent) == 1
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_after_repeated_failures(monkeypatch, fresh_breaker):
+    status = 503
+    sent = _serve(monkeypatch, lambda: httpx.Response(status, json={"ok": status < 400}))
+    
+    # The first call fails four attempts; the fifth failure, on the next call, opens the breaker
+    # and that call's retry is refused without another request
+    with pytest.raises(httpx.HTTPStatusError):
+        await n8n.trigger_post_publishing("post-1")
+    with pytest.raises(n8n.N8nUnavailableError):
+        await n8n.trigger_post_publishing("post-1")
+    assert len(sent) == 5
+    
+    with pytest.raises(n8n.N8nUnavailableError):
+        await n8n.trigger_post_publishing("post-1")
+    assert len(sent) == 5
+    
+    # After the cool-down, a successful call goes through and closes the breaker
+    fresh_breaker._opened_at -= fresh_breaker.reset_timeout
+    status = 200
+    result = await n8n.trigger_post_publishing("post-1")
+    
+    assert result.ok
+    assert len(sent) == 6
+    assert fresh_breaker._opened_at is None
+
+
+@pytest.mark.anyio
+async def test_breaker_ignores_errors_without_a_response(monkeypatch, fresh_breaker):
+    def handler(request):
+        raise RuntimeError("N8N_WEBHOOK_URL is not set")
+    
+    _use_handler(monkeypatch, handler)
+    fresh_breaker._failures = fresh_breaker.fail_max - 1
+    
+    with pytest.raises(RuntimeError):
+        await n8n.trigger_post_publishing("post-1")
+    
+    assert fresh_breaker._failures == fresh_breaker.fail_max - 1
+
+
+@pytest.mark.anyio
+async def test_half_open_breaker_lets_one_probe_through(monkeypatch, fresh_breaker):
+    sent = []
+    respond = asyncio.Event()
+    
+    async def handler(request):
+        sent.append(request)
+        await respond.wait()
+        return httpx.Response(200, json={"ok": True})
+    
+    _use_handler(monkeypatch, handler)
+    fresh_breaker._failures = fresh_breaker.fail_max
+    fresh_breaker._opened_at = time.monotonic() - fresh_breaker.reset_timeout
+    
+    # While the first call after the cool-down probes n8n, the others still fail fast
+    probe = asyncio.create_task(n8n.trigger_post_publishing("post-1"))
+    while not sent:
+        await asyncio.sleep(0)
+    with pytest.raises(n8n.N8nUnavailableError):
+        await n8n.trigger_post_publishing("post-2")
+    
+    respond.set()
+    assert (await probe).ok
+    assert len(sent) == 1
+    assert fresh_breaker._opened_at is None
@@ -1,21 +1,17 @@
 import pytest
-from fastapi.testclient import TestClient
-from backend.main import app
 
-client = TestClient(app)
-
-def test_create_organization():
-    token = "Bearer <valid_access_token>"
-    response = client.post(
+@pytest.mark.anyio
+async def test_create_organization(aclient, auth_headers):
+    response = await aclient.post(
         "/organizations/",
-        headers={"Authorization": token},
+        headers=auth_headers,
         json={"name": "Test Org"}
     )
     assert response.status_code == 200
     assert "id" in response.json()[0]
 
-def test_list_organizations():
-    token = "Bearer <valid_access_token>"
-    response = client.get("/organizations/", headers={"Authorization": token})
+@pytest.mark.anyio
+async def test_list_organizations(aclient, auth_headers):
+    response = await aclient.get("/organizations/", headers=auth_headers)
     assert response.status_code == 200
     assert isinstance(response.json(), list)
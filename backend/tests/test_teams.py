@@ -1,23 +1,19 @@
 import pytest
-from fastapi.testclient import TestClient
-from backend.main import app
 
-client = TestClient(app)
-
-def test_create_team():
-    token = "Bearer <valid_access_token>"
+@pytest.mark.anyio
+async def test_create_team(aclient, auth_headers):
     org_id = "<org_id>"
-    response = client.post(
+    response = await aclient.post(
         "/teams/",
-        headers={"Authorization": token},
+        headers=auth_headers,
         json={"name": "Test Team", "org_id": org_id}
     )
     assert response.status_code == 200
     assert "id" in response.json()[0]
 
-def test_list_teams_requires_org_id():
-    token = "Bearer <valid_access_token>"
-    response = client.get("/teams/", headers={"Authorization": token})
+@pytest.mark.anyio
+async def test_list_teams_requires_org_id(aclient, auth_headers):
+    response = await aclient.get("/teams/", headers=auth_headers)
     assert response.status_code == 422  # Missing org_id
 
 # Add more tests for update, delete, admin check, etc.
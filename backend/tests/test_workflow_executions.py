@@ -0,0 +1,64 @@
+import os
+import time
+from uuid import uuid4
+
+import pytest
+from backend.src.routes.workflows.executions import ExecutionStore
+
+
+def _execution(workflow_id):
+    return {"workflow_id": workflow_id, "status": "completed", "results": {"ok": True}, "error": None}
+
+
+async def _finish(store, workflow_id):
+    execution_id = str(uuid4())
+    store.add(execution_id, _execution(workflow_id))
+    await store.finish(execution_id)
+    return execution_id
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_execution_is_written_out(tmp_path):
+    store = ExecutionStore(tmp_path, max_finished=2)
+    first = await _finish(store, "first")
+    second = await _finish(store, "second")
+    
+    # Reading the first execution makes the second the least recently used
+    await store.get(first)
+    await _finish(store, "third")
+    
+    assert second not in store._finished
+    assert (tmp_path / f"{second}.json").is_file()
+    assert await store.get(second) == _execution("second")
+    assert first in store._finished
+
+
+@pytest.mark.anyio
+async def test_idle_execution_is_written_out_after_ttl(tmp_path):
+    store = ExecutionStore(tmp_path, ttl=0)
+    execution_id = await _finish(store, "idle")
+    
+    assert not store._finished
+    assert await store.get(execution_id) == _execution("idle")
+
+
+@pytest.mark.anyio
+async def test_expired_files_are_deleted(tmp_path):
+    store = ExecutionStore(tmp_path, ttl=0, retention=3600)
+    stale = tmp_path / f"{uuid4()}.json"
+    stale.write_text("{}")
+    old = time.time() - 7200
+    os.utime(stale, (old, old))
+    
+    execution_id = await _finish(store, "recent")
+    
+    assert not stale.exists()
+    assert await store.get(execution_id) == _execution("recent")
+
+
+@pytest.mark.anyio
+async def test_unknown_execution_is_not_found(tmp_path):
+    store = ExecutionStore(tmp_path)
+    
+    assert await store.get(str(uuid4())) is None
+    assert await store.get("not-a-uuid") is None
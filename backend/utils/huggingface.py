@@ -1,19 +1,97 @@
 import os
-import requests
+import time
+import hashlib
+import functools
+import logging
+from collections import OrderedDict
+import httpx
+from backend.src.utils.json_utils import dumps_json, loads_json
+
+try:
+    import h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
-HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 BASE_URL = "https://api-inference.huggingface.co/models/"
 
-headers = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
+# Shared client so inference calls reuse keep-alive connections instead of a new TLS handshake each
+_client = None
+
+@functools.cache
+def _api_key():
+    # Without a key every call would only come back as a 401
+    api_key = os.environ.get("HUGGINGFACE_API_KEY")
+    if not api_key:
+        raise RuntimeError("HUGGINGFACE_API_KEY is not set")
+    return api_key
+
+def check_config():
+    # Call at application startup so a misconfigured process fails before serving requests
+    _api_key()
+
+def get_client():
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            # The authorization header is set once as a client default rather than passed per call
+            headers={"Authorization": f"Bearer {_api_key()}"},
+            # HTTP/2 multiplexes concurrent requests over one connection, so bursts don't exhaust the pool
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(60.0, connect=5.0, pool=5.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+    return _client
+
+async def close_client():
+    # Call on application shutdown to release pooled connections
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def _post_inputs_raw(model_name, inputs):
+    # Read the body in chunks into one buffer and keep the raw bytes, skipping
+    # the decoded text copy that response.json() would make of long generations
+    async with get_client().stream(
+        "POST", model_name, content=dumps_json({"inputs": inputs}), headers=_JSON_HEADERS
+    ) as response:
+        logger.debug("Hugging Face %s responded over %s", model_name, response.http_version)
+        response.raise_for_status()
+        body = bytearray()
+        async for chunk in response.aiter_bytes(65536):
+            body += chunk
+    return bytes(body)
+
+# Summaries are deterministic per model and text, so repeated texts are served from memory.
+# Raw response bodies are cached and parsed per hit, so callers never share a mutable result.
+SUMMARY_CACHE_SIZE = 1024
+SUMMARY_CACHE_TTL = 24 * 60 * 60
+_summary_cache = OrderedDict()
+
+def _summary_cache_key(model_name, text):
+    return model_name, hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-def generate_text(model_name, prompt):
-    url = f"{BASE_URL}{model_name}"
-    response = requests.post(url, headers=headers, json={"inputs": prompt})
-    response.raise_for_status()
-    return response.json()
+async def generate_text(model_name, prompt):
+    return loads_json(await _post_inputs_raw(model_name, prompt))
 
-def summarize_text(model_name, text):
-    url = f"{BASE_URL}{model_name}"
-    response = requests.post(url, headers=headers, json={"inputs": text})
-    response.raise_for_status()
-    return response.json()
+async def summarize_text(model_name, text):
+    key = _summary_cache_key(model_name, text)
+    cached = _summary_cache.get(key)
+    if cached is not None:
+        stored_at, body = cached
+        if time.monotonic() - stored_at < SUMMARY_CACHE_TTL:
+            _summary_cache.move_to_end(key)
+            return loads_json(body)
+        del _summary_cache[key]
+    
+    body = await _post_inputs_raw(model_name, text)
+    _summary_cache[key] = (time.monotonic(), body)
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+    return loads_json(body)
@@ -1,46 +1,196 @@
 import os
-import requests
+import time
+import asyncio
+import functools
+import logging
+from typing import Optional, Union
+import httpx
+from pydantic import BaseModel, ConfigDict, ValidationError
+from tenacity import retry, retry_if_exception, stop_after_attempt, stop_after_delay, wait_random_exponential
+from backend.src.utils.json_utils import dumps_json, loads_json
 
-N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL")
+logger = logging.getLogger(__name__)
 
-def trigger_post_publishing(post_id):
+# Platforms the /publish-social webhook distributes content to
+PLATFORMS = ("instagram", "linkedin", "facebook", "twitter", "threads", "blog", "youtube")
+
+class N8nResult(BaseModel):
+    """Response of an n8n webhook; fields beyond the common ones are kept as extras"""
+    model_config = ConfigDict(extra="allow")
+    
+    ok: bool = True
+    id: Optional[Union[str, int]] = None
+    error: Optional[str] = None
+
+# Shared client so webhook calls reuse pooled keep-alive connections
+_client = None
+_MAX_CONNECTIONS = 100
+
+@functools.cache
+def _base_url():
+    # Read, parsed and validated once; httpx joins the relative webhook
+    # paths onto it whether or not N8N_WEBHOOK_URL ends with a slash
+    webhook_url = os.environ.get("N8N_WEBHOOK_URL")
+    if not webhook_url:
+        raise RuntimeError("N8N_WEBHOOK_URL is not set")
+    url = httpx.URL(webhook_url)
+    if url.scheme not in ("http", "https") or not url.host:
+        raise ValueError(f"N8N_WEBHOOK_URL must be an absolute http(s) URL, got {webhook_url!r}")
+    return url
+
+def check_config():
+    # Call at application startup so a misconfigured process fails before serving requests
+    _base_url()
+
+def get_client():
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=_base_url(),
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=_MAX_CONNECTIONS, max_keepalive_connections=_MAX_CONNECTIONS),
+        )
+    return _client
+
+async def close_client():
+    # Call on application shutdown to release pooled connections
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _is_transient(exc):
+    # Network errors and 5xx responses are worth retrying; 4xx responses will fail the same way again
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+class N8nUnavailableError(Exception):
+    """Raised without contacting n8n while the circuit breaker is open"""
+
+class _CircuitBreaker:
+    """Fail fast after repeated n8n failures instead of waiting out timeouts and retries"""
+    
+    def __init__(self, fail_max=5, reset_timeout=30.0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+    
+    def before_call(self):
+        if self._opened_at is None:
+            return
+        if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+            raise N8nUnavailableError("n8n webhooks are unavailable, try again later")
+        # Half-open: once the cool-down has passed, one call probes n8n while the rest keep failing fast
+        self._probing = True
+    
+    def end_call(self):
+        # A probe that ends without an answer from n8n, e.g. on a config error or cancellation,
+        # leaves the next call to probe instead
+        self._probing = False
+    
+    def record_success(self):
+        # Any response below 500 shows n8n is up, including a 4xx
+        self._failures = 0
+        self._opened_at = None
+    
+    def record_failure(self):
+        # A failed probe reopens the breaker for another cool-down
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
+
+_breaker = _CircuitBreaker()
+
+# Exponential backoff with full jitter, bounded so callers never wait long on a failing n8n
+_retry_transient = retry(
+    retry=retry_if_exception(_is_transient),
+    wait=wait_random_exponential(multiplier=1, max=8),
+    stop=stop_after_attempt(4) | stop_after_delay(16),
+    reraise=True,
+)
+
+async def _post(path, payload):
+    # Every attempt passes through the breaker, so an open breaker also cuts retries short
+    _breaker.before_call()
+    try:
+        response = await get_client().post(path, content=dumps_json(payload), headers=_JSON_HEADERS)
+    except httpx.TransportError:
+        _breaker.record_failure()
+        raise
+    finally:
+        _breaker.end_call()
+    
+    # Successful responses skip the error path entirely; failures are logged with n8n's
+    # response body, which usually says which workflow node failed
+    if response.status_code >= 400:
+        logger.warning("n8n %s -> %s %s", path, response.status_code, response.text[:512])
+        error = httpx.HTTPStatusError(
+            f"n8n webhook {path} failed with status {response.status_code}",
+            request=response.request,
+            response=response,
+        )
+        if _is_transient(error):
+            _breaker.record_failure()
+        else:
+            _breaker.record_success()
+        raise error
+    
+    _breaker.record_success()
+    # Validate the body bytes directly, without building an intermediate dict;
+    # webhooks that respond with no body still count as a success
+    if not response.content:
+        return N8nResult()
+    try:
+        return N8nResult.model_validate_json(response.content)
+    except ValidationError:
+        # The call itself succeeded; a body that isn't a JSON object (a list, a
+        # plain-text "Workflow was started", ...) is kept as-is under raw
+        try:
+            raw = loads_json(response.content)
+        except ValueError:
+            raw = response.text
+        return N8nResult(raw=raw)
+
+@_retry_transient
+async def trigger_post_publishing(post_id):
     # Call n8n webhook to publish scheduled post
-    response = requests.post(f"{N8N_WEBHOOK_URL}/publish-post", json={"post_id": post_id})
-    response.raise_for_status()
-    return response.json()
+    return await _post("/publish-post", {"post_id": post_id})
 
-def trigger_email_campaign(campaign_id):
-    response = requests.post(f"{N8N_WEBHOOK_URL}/start-email-campaign", json={"campaign_id": campaign_id})
-    response.raise_for_status()
-    return response.json()
+@_retry_transient
+async def trigger_email_campaign(campaign_id):
+    return await _post("/start-email-campaign", {"campaign_id": campaign_id})
 
-def trigger_social_post(platform, content, metadata=None):
+@_retry_transient
+async def trigger_social_post(platform, content, metadata=None):
     # Call n8n webhook to distribute content to the specified platform
-    response = requests.post(f"{N8N_WEBHOOK_URL}/publish-social", json={
+    return await _post("/publish-social", {
         "platform": platform,
         "content": content,
         "metadata": metadata or {}
     })
-    response.raise_for_status()
-    return response.json()
-
-def trigger_instagram_post(content, metadata=None):
-    return trigger_social_post("instagram", content, metadata)
-
-def trigger_linkedin_post(content, metadata=None):
-    return trigger_social_post("linkedin", content, metadata)
-
-def trigger_facebook_post(content, metadata=None):
-    return trigger_social_post("facebook", content, metadata)
-
-def trigger_twitter_post(content, metadata=None):
-    return trigger_social_post("twitter", content, metadata)
 
-def trigger_threads_post(content, metadata=None):
-    return trigger_social_post("threads", content, metadata)
+async def trigger_social_posts(platforms, content, metadata=None):
+    # Publish the same content to several platforms concurrently; each platform maps to
+    # its webhook response, or to the exception it raised so one failure doesn't abort the rest
+    results = await asyncio.gather(
+        *(trigger_social_post(platform, content, metadata) for platform in platforms),
+        return_exceptions=True
+    )
+    return dict(zip(platforms, results))
 
-def trigger_blog_post(content, metadata=None):
-    return trigger_social_post("blog", content, metadata)
+async def _run_in_background(trigger, *args, **kwargs):
+    # Nobody awaits a background trigger, so failures are logged rather than raised
+    try:
+        await trigger(*args, **kwargs)
+    except Exception as e:
+        logger.error("Background n8n trigger %s failed: %s", trigger.__name__, e)
 
-def trigger_youtube_post(content, metadata=None):
-    return trigger_social_post("youtube", content, metadata)
+def schedule_trigger(background_tasks, trigger, *args, **kwargs):
+    # Run a fire-and-forget trigger after the response is sent, e.g.
+    # schedule_trigger(background_tasks, trigger_post_publishing, post_id) in a route taking BackgroundTasks
+    background_tasks.add_task(_run_in_background, trigger, *args, **kwargs)